@@ -0,0 +1,185 @@
+import cv2
+import numpy as np
+from functools import lru_cache
+from typing import List, Tuple
+
+try:
+    import torch
+    TORCH_DISPONIVEL = True
+except ImportError:
+    TORCH_DISPONIVEL = False
+
+# Valores padrão do "Salesforce/blip-image-captioning-base"
+TAMANHO_PADRAO = 384
+MEDIA_PADRAO = (0.48145466, 0.4578275, 0.40821073)
+DESVIO_PADRAO = (0.26862954, 0.26130258, 0.27577711)
+
+# Máximo de frames por chamada ao `generate` (num_beams=5 multiplica a memória)
+LOTE_MAXIMO = 4
+
+# Coeficientes arredondados como no ponto fixo do PIL para imagens de 8 bits
+_BITS_PRECISAO = 32 - 8 - 2
+
+# Saídas por faixa da matriz de pesos (medido: 16 é o mais rápido para 720p -> 384)
+_SAIDAS_POR_FAIXA = 16
+
+
+def _bicubico(x: np.ndarray) -> np.ndarray:
+    """Kernel bicúbico do PIL (a = -0.5)"""
+    a = -0.5
+    x = np.abs(x)
+    return np.where(x < 1, ((a + 2) * x - (a + 3)) * x * x + 1,
+                    np.where(x < 2, (((x - 5) * x + 8) * x - 4) * a, 0.0))
+
+
+def _pesos_redimensionamento(entrada: int, saida: int) -> np.ndarray:
+    """
+    Matriz (saida, entrada) float32 com os coeficientes que o PIL usa no
+    resize BICUBIC, inclusive o antialias ao reduzir (suporte escalado)
+    """
+    escala = entrada / saida
+    escala_filtro = max(escala, 1.0)
+    suporte = 2.0 * escala_filtro
+
+    pesos = np.zeros((saida, entrada), dtype=np.float32)
+    for xx in range(saida):
+        centro = (xx + 0.5) * escala
+        xmin = max(int(centro - suporte + 0.5), 0)
+        xmax = min(int(centro + suporte + 0.5), entrada)
+        k = _bicubico((np.arange(xmin, xmax) - centro + 0.5) / escala_filtro)
+        k = k / k.sum()
+        # Arredondamento do PIL para coeficientes de 8 bits
+        k = k * (1 << _BITS_PRECISAO)
+        k = np.trunc(np.where(k < 0, k - 0.5, k + 0.5))
+        pesos[xx, xmin:xmax] = k / (1 << _BITS_PRECISAO)
+    return pesos
+
+
+@lru_cache(maxsize=16)
+def _faixas_redimensionamento(entrada: int, saida: int) -> List[Tuple[int, int, int, int, np.ndarray]]:
+    """
+    Os pesos de _pesos_redimensionamento em faixas de saídas (o0, o1, i0, i1, pesos):
+    cada saída só usa ~4 * escala entradas, então cada faixa multiplica apenas
+    as colunas i0:i1 que os seus coeficientes alcançam, não a largura toda
+    """
+    pesos = _pesos_redimensionamento(entrada, saida)
+    faixas = []
+    for o0 in range(0, saida, _SAIDAS_POR_FAIXA):
+        o1 = min(o0 + _SAIDAS_POR_FAIXA, saida)
+        usadas = np.flatnonzero(pesos[o0:o1].any(axis=0))
+        i0, i1 = int(usadas[0]), int(usadas[-1]) + 1
+        faixas.append((o0, o1, i0, i1, np.ascontiguousarray(pesos[o0:o1, i0:i1])))
+    return faixas
+
+
+def _arredondar_8bits(valores: np.ndarray) -> np.ndarray:
+    """Arredonda e limita a 0-255 (no lugar), como o PIL faz após cada passada"""
+    valores += 0.5
+    np.floor(valores, out=valores)
+    return np.clip(valores, 0, 255, out=valores)
+
+
+class PreprocessadorBLIP:
+    """
+    Prepara frames BGR do OpenCV direto para o `pixel_values` do BLIP,
+    sem passar por PIL (resize bicúbico do PIL reproduzido em NumPy)
+    """
+
+    def __init__(self, processor=None, tamanho: int = TAMANHO_PADRAO):
+        """
+        Args:
+            processor: BlipProcessor carregado (usa o tamanho/média/desvio dele)
+            tamanho: Lado da imagem quadrada esperada pelo modelo
+        """
+        media, desvio, fator = MEDIA_PADRAO, DESVIO_PADRAO, 1 / 255
+        image_processor = getattr(processor, "image_processor", None)
+        if image_processor is not None:
+            tamanho = image_processor.size.get("height", tamanho)
+            media = image_processor.image_mean
+            desvio = image_processor.image_std
+            fator = image_processor.rescale_factor
+
+        self.tamanho = tamanho
+        # (x * fator - media) / desvio  ==  x * escala - deslocamento
+        self.escala = (fator / np.asarray(desvio, dtype=np.float32)).astype(np.float32)
+        self.deslocamento = (np.asarray(media, dtype=np.float32) / np.asarray(desvio, dtype=np.float32)).astype(np.float32)
+
+        self._buffer_lote = np.empty((0, 3, tamanho, tamanho), dtype=np.float32)
+
+    def _planos_rgb(self, frame: np.ndarray) -> np.ndarray:
+        """Frame BGR (H, W, 3) uint8 -> planos RGB (3, H, W) float32"""
+        planos = np.empty((3,) + frame.shape[:2], dtype=np.float32)
+        for c, plano in enumerate(reversed(cv2.split(frame))):
+            planos[c] = plano
+        return planos
+
+    def _redimensionar(self, frames: List[np.ndarray], destino: np.ndarray):
+        """
+        Frames BGR do mesmo tamanho -> `destino` (N, 3, tamanho, tamanho), valores 0-255.
+        Horizontal e depois vertical, arredondando para 8 bits após cada passada (como o PIL);
+        em float32 um valor raro pode cair um passo de uint8 ao lado.
+        """
+        altura, largura = frames[0].shape[:2]
+        n, t = len(frames), self.tamanho
+
+        # Passada horizontal, frame a frame (cada um já chega como array separado)
+        if largura != t:
+            horizontal = np.empty((n, 3, altura, t), dtype=np.float32)
+            faixas = _faixas_redimensionamento(largura, t)
+            for frame, saida in zip(frames, horizontal):
+                planos = self._planos_rgb(frame).reshape(3 * altura, largura)
+                saida = saida.reshape(3 * altura, t)
+                for o0, o1, i0, i1, pesos in faixas:
+                    np.matmul(planos[:, i0:i1], pesos.T, out=saida[:, o0:o1])
+            _arredondar_8bits(horizontal)
+        else:
+            horizontal = np.stack([self._planos_rgb(frame) for frame in frames])
+
+        if altura == t:
+            destino[:] = horizontal
+            return
+
+        # Passada vertical sobre o lote inteiro de uma vez
+        horizontal = horizontal.reshape(n * 3, altura, t)
+        vertical = destino.reshape(n * 3, t, t)
+        for o0, o1, i0, i1, pesos in _faixas_redimensionamento(altura, t):
+            np.matmul(pesos, horizontal[:, i0:i1], out=vertical[:, o0:o1])
+        _arredondar_8bits(vertical)
+
+    def preparar_lote(self, frames: List[np.ndarray]) -> np.ndarray:
+        """Converte uma lista de frames BGR em um array (N, 3, H, W) float32 normalizado"""
+        n = len(frames)
+        if self._buffer_lote.shape[0] < n:
+            self._buffer_lote = np.empty((n, 3, self.tamanho, self.tamanho), dtype=np.float32)
+        lote = self._buffer_lote[:n]
+
+        # Frames de um mesmo vídeo têm o mesmo tamanho: normalmente é um grupo só
+        grupos = {}
+        for i, frame in enumerate(frames):
+            grupos.setdefault(frame.shape[:2], []).append(i)
+        for indices in grupos.values():
+            if len(indices) == n:
+                self._redimensionar(frames, lote)
+            else:
+                destino = np.empty((len(indices), 3, self.tamanho, self.tamanho), dtype=np.float32)
+                self._redimensionar([frames[i] for i in indices], destino)
+                lote[indices] = destino
+
+        # Normalização vetorizada sobre o lote inteiro
+        lote *= self.escala[None, :, None, None]
+        lote -= self.deslocamento[None, :, None, None]
+        return lote
+
+    def preparar(self, frames: List[np.ndarray]):
+        """
+        Retorna os `inputs` prontos para `model.generate(**inputs)`. O tensor
+        aponta para o buffer interno (sem cópia): vale até a próxima chamada.
+        """
+        if not TORCH_DISPONIVEL:
+            raise RuntimeError("Para IA, instale: pip install transformers torch pillow")
+        return {"pixel_values": torch.from_numpy(self.preparar_lote(frames))}
+
+
+def dividir_em_lotes(frames: List[np.ndarray], tamanho: int = LOTE_MAXIMO) -> List[List[np.ndarray]]:
+    """Quebra a lista de frames em lotes de no máximo `tamanho`"""
+    return [frames[i:i + tamanho] for i in range(0, len(frames), tamanho)]
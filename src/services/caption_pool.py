@@ -0,0 +1,171 @@
+import os
+import time
+import weakref
+import numpy as np
+from typing import List, Optional
+
+# O pool só precisa do torch; o transformers só é importado pelo worker que
+# carrega o BLIP do disco (um modelo já carregado é recebido pronto)
+try:
+    import torch
+    import torch.multiprocessing as tmp
+    from blip_preprocess import PreprocessadorBLIP, LOTE_MAXIMO, dividir_em_lotes
+    TORCH_DISPONIVEL = True
+except ImportError:
+    TORCH_DISPONIVEL = False
+
+MODELO_BLIP = "Salesforce/blip-image-captioning-base"
+MODOS = ("throughput", "latency")
+
+# Estado de cada processo worker
+_processor = None
+_model = None
+_preprocessador = None
+
+
+def nucleos_disponiveis() -> List[int]:
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def dividir_nucleos(num_workers: int, nucleos: Optional[List[int]] = None) -> List[List[int]]:
+    """Divide os núcleos disponíveis em `num_workers` fatias contíguas"""
+    if nucleos is None:
+        nucleos = nucleos_disponiveis()
+    num_workers = max(1, min(num_workers, len(nucleos)))
+    return [fatia.tolist() for fatia in np.array_split(np.array(nucleos), num_workers)]
+
+
+def planejar_workers(num_workers: Optional[int], modo: str, nucleos: Optional[List[int]] = None) -> List[List[int]]:
+    """
+    Fatias de núcleos de cada worker conforme o modo:
+    - "throughput": vários workers, cada um com a sua fatia (padrão: 4 núcleos por worker)
+    - "latency": um único worker com todos os núcleos
+    """
+    if modo not in MODOS:
+        raise ValueError(f"modo deve ser um de {MODOS}, recebido: {modo!r}")
+    if nucleos is None:
+        nucleos = nucleos_disponiveis()
+
+    if modo == "latency":
+        if num_workers not in (None, 1):
+            raise ValueError("modo 'latency' usa um único worker com todos os núcleos; use num_workers=None ou 1")
+        return [list(nucleos)]
+
+    if num_workers is None:
+        num_workers = max(1, len(nucleos) // 4)
+    if num_workers < 1:
+        raise ValueError("num_workers deve ser pelo menos 1")
+    return dividir_nucleos(num_workers, nucleos)
+
+
+def _processo_vivo(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _reservar_fatia(fatias: List[List[int]], donos) -> List[int]:
+    """Pega a primeira fatia sem dono vivo (um worker substituto herda a do que morreu)"""
+    with donos.get_lock():
+        for i, pid in enumerate(donos):
+            if pid == 0 or not _processo_vivo(pid):
+                donos[i] = os.getpid()
+                return fatias[i]
+    # Mais workers que fatias não deveria acontecer; divide com o primeiro
+    return fatias[0]
+
+
+def _iniciar_worker(fatias, donos, processor, model):
+    """Fixa o worker na sua fatia de núcleos e ajusta as threads do PyTorch"""
+    global _processor, _model, _preprocessador
+
+    nucleos = _reservar_fatia(fatias, donos)
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, nucleos)
+    torch.set_num_threads(len(nucleos))
+
+    if model is None:
+        from transformers import BlipProcessor, BlipForConditionalGeneration
+        processor = BlipProcessor.from_pretrained(MODELO_BLIP)
+        model = BlipForConditionalGeneration.from_pretrained(MODELO_BLIP)
+    _processor, _model = processor, model
+    _model.eval()
+    _preprocessador = PreprocessadorBLIP(_processor)
+
+
+def legendar_lote(processor, model, preprocessador, frames: List[np.ndarray]) -> List[str]:
+    """
+    Um lote pelo BLIP. Usado tanto pelos workers quanto pelo modo sem pool
+    (VideoAI, YouTubeVideoAnalyzer), para os dois rodarem exatamente igual
+    """
+    with torch.inference_mode():
+        inputs = preprocessador.preparar(frames)
+        output = model.generate(**inputs, max_length=50, num_beams=5)
+    return processor.batch_decode(output, skip_special_tokens=True)
+
+
+def _legendar_lote(frames: List[np.ndarray]) -> List[str]:
+    """Executado dentro do worker"""
+    return legendar_lote(_processor, _model, _preprocessador, frames)
+
+
+class PoolLegendas:
+    def __init__(self, processor=None, model=None, num_workers: Optional[int] = None, modo: str = "throughput"):
+        """
+        Pool de processos para legendar frames com o BLIP
+        Args:
+            processor, model: BLIP já carregado (pesos em memória compartilhada, sem cópia por worker)
+            num_workers: Número de processos (None = escolhido pelo modo)
+            modo: "throughput" (vários workers com poucas threads) ou "latency" (um worker com todos os núcleos)
+        """
+        if not TORCH_DISPONIVEL:
+            raise RuntimeError("Para IA, instale: pip install transformers torch pillow")
+
+        self.fatias = planejar_workers(num_workers, modo)
+        self.num_workers = len(self.fatias)
+
+        # "spawn" em vez de fork: o pai já usou o torch (OpenMP não sobrevive a fork);
+        # os pesos vão para memória compartilhada e os workers mapeiam a mesma cópia
+        contexto = tmp.get_context("spawn")
+        if model is not None:
+            model.share_memory()
+        donos = contexto.Array('i', self.num_workers)
+
+        print(f"⚙️ Iniciando {self.num_workers} worker(s) de legenda ({modo}): {[len(f) for f in self.fatias]} núcleos cada")
+        self.pool = contexto.Pool(self.num_workers, initializer=_iniciar_worker,
+                                  initargs=(self.fatias, donos, processor, model))
+        # Garante que os workers não sobrevivem ao programa se ninguém chamar fechar()
+        self._finalizar = weakref.finalize(self, self.pool.terminate)
+
+    def legendar(self, frames: List[np.ndarray]) -> List[str]:
+        """Distribui os frames entre os workers em lotes de no máximo LOTE_MAXIMO, mantendo a ordem"""
+        if not frames:
+            return []
+        tamanho = min(LOTE_MAXIMO, -(-len(frames) // self.num_workers))
+        resultados = self.pool.map(_legendar_lote, dividir_em_lotes(frames, tamanho), chunksize=1)
+        return [descricao for lote in resultados for descricao in lote]
+
+    def medir_vazao(self, frames: List[np.ndarray], repeticoes: int = 3) -> float:
+        """Legendas por segundo deste pool para `frames` (primeira rodada descartada como aquecimento)"""
+        self.legendar(frames)
+        inicio = time.perf_counter()
+        for _ in range(repeticoes):
+            self.legendar(frames)
+        return len(frames) * repeticoes / (time.perf_counter() - inicio)
+
+    def fechar(self):
+        if self._finalizar.detach() is not None:
+            self.pool.close()
+            self.pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.fechar()
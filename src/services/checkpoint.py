@@ -0,0 +1,54 @@
+import os
+import json
+import hashlib
+from typing import Dict
+
+
+class JobCheckpoint:
+    def __init__(self, pasta_jobs: str, entradas: Dict):
+        """
+        Guarda o progresso de uma análise para retomar depois de uma falha
+        Args:
+            pasta_jobs: Pasta onde ficam as pastas de cada job
+            entradas: Parâmetros que identificam o job (mesmas entradas = mesmo job)
+        """
+        chave = json.dumps(entradas, sort_keys=True, ensure_ascii=False)
+        self.id_job = hashlib.sha1(chave.encode("utf-8")).hexdigest()[:12]
+        self.pasta = os.path.join(pasta_jobs, self.id_job)
+        self.caminho_estado = os.path.join(self.pasta, "estado.json")
+
+        if not os.path.exists(self.pasta):
+            os.makedirs(self.pasta)
+
+        self.estado = {"entradas": entradas}
+        if os.path.exists(self.caminho_estado):
+            try:
+                with open(self.caminho_estado, "r", encoding="utf-8") as f:
+                    self.estado = json.load(f)
+                print(f"♻️ Retomando job {self.id_job} (etapas concluídas: {', '.join(self.etapas_concluidas()) or 'nenhuma'})")
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"⚠️ Checkpoint ilegível, recomeçando job {self.id_job}: {e}")
+
+    def get(self, chave: str, padrao=None):
+        return self.estado.get(chave, padrao)
+
+    def salvar(self, **valores):
+        """Atualiza o estado e grava em disco de forma atômica"""
+        self.estado.update(valores)
+        caminho_tmp = self.caminho_estado + ".tmp"
+        with open(caminho_tmp, "w", encoding="utf-8") as f:
+            json.dump(self.estado, f, ensure_ascii=False, indent=2)
+        os.replace(caminho_tmp, self.caminho_estado)
+
+    def concluir(self, etapa: str, **valores):
+        """Marca uma etapa como concluída junto com o seu resultado"""
+        etapas = self.estado.get("etapas", [])
+        if etapa not in etapas:
+            etapas.append(etapa)
+        self.salvar(etapas=etapas, **valores)
+
+    def concluida(self, etapa: str) -> bool:
+        return etapa in self.estado.get("etapas", [])
+
+    def etapas_concluidas(self):
+        return self.estado.get("etapas", [])
@@ -4,14 +4,15 @@ import cv2
 # For creating folders
 import os
 
+# Shared sampling strategies (grab() for skipped frames)
+import frame_sampler
+
 
 # This creates a function that can extract key frames from any video
 def extract_key_frames(video_path, num_frames = 5, output_folder="extracted_frames"):
     """Extract frames at regular intervals"""
 
 
-    frames_folder = "extracted_frames"
-
     # Create a folder for frames
     if not os.path.exists(output_folder):
         os.makedirs(output_folder)
@@ -28,45 +29,28 @@ def extract_key_frames(video_path, num_frames = 5, output_folder="extracted_fram
         return
     
 
-    # Get total frames
-    total_frames = int(video.get(cv2.CAP_PROP_FRAME_COUNT))
+    # Get total frames (0 when the container doesn't tell)
+    total_frames = frame_sampler.capture_info(video)["total_frames"]
     print(f"Total frames: {total_frames}")
 
 
-    # Calculate which frames to extract
-    frame_interval = total_frames // num_frames
-    frame_count = 0
+    # Calculate which frames to extract (unknown length: read sequentially until EOF)
+    frame_interval = max(total_frames // num_frames, 1)
+    indices = frame_sampler.every_n_indices(total_frames, frame_interval, num_frames)
     saved_count = 0
 
 
-    # Loop to the read and show many frames!
-    while True:
-
-        # Read the next frame
-        ret, frame = video.read()
-
-        # If no more frames, stop
-        if not ret: 
-            break
-        
-
-        # Check if this is a frame we want to save
-        if frame_count % frame_interval == 0:
-            filename = os.path.join(frames_folder, f"summary_frame_{saved_count}.jpg")
-            cv2.imwrite(filename, frame)
-            print(f"Saved: {filename}")
-            saved_count += 1
-        
-        frame_count += 1
-
-
-        # Stop when we have enough key frames
-        if saved_count >= num_frames:
-            break
+    # Only the frames we want are decoded, the others are just skipped
+    for frame_count, frame in frame_sampler.sample_capture(video, indices):
+        filename = os.path.join(output_folder, f"summary_frame_{saved_count}.jpg")
+        cv2.imwrite(filename, frame)
+        print(f"Saved: {filename}")
+        saved_count += 1
         
 
     # Close the video file properly
     video.release()
-    print(f"Summary complete! Saved {saved_count} key frames in '{frames_folder}' folder")
+    print(f"Summary complete! Saved {saved_count} key frames in '{output_folder}' folder")
 
-extract_key_frames("../../video.mp4", 10)
\ No newline at end of file
+if __name__ == "__main__":
+    extract_key_frames("../../video.mp4", 10)
\ No newline at end of file
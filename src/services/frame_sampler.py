@@ -0,0 +1,202 @@
+import cv2
+import sys
+import numpy as np
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+
+def video_info(video_path: str) -> Optional[Dict]:
+    """Returns total_frames/fps of a video, or None if it can't be opened"""
+    video = cv2.VideoCapture(video_path)
+    if not video.isOpened():
+        return None
+    info = capture_info(video)
+    video.release()
+    return info
+
+
+def capture_info(video) -> Dict:
+    """total_frames/fps of an already opened capture (total_frames <= 0 means unknown)"""
+    return {
+        "total_frames": int(video.get(cv2.CAP_PROP_FRAME_COUNT)),
+        "fps": video.get(cv2.CAP_PROP_FPS),
+    }
+
+
+def default_seek_gap(fps: float, total_frames: int) -> float:
+    """How many frames away the next sample must be before seeking beats grab()"""
+    if total_frames <= 0:
+        # Unknown length: seeking can't be trusted, read sequentially until EOF
+        return float("inf")
+    # About two seconds: past that a seek (keyframe + decode) beats grabbing
+    return max(int(fps * 2), 30) if fps > 0 else 60
+
+
+def every_n_indices(total_frames: int, n: int, max_frames: Optional[int] = None) -> Sequence[int]:
+    """0, n, 2n, ... up to the end of the video (unbounded when the length is unknown)"""
+    indices = range(0, total_frames if total_frames > 0 else sys.maxsize, max(n, 1))
+    return indices[:max_frames] if max_frames is not None else indices
+
+
+def uniform_indices(total_frames: int, num_frames: int) -> List[int]:
+    """`num_frames` indices evenly spread from the first to the last frame"""
+    if total_frames <= 0:
+        return []
+    return np.linspace(0, total_frames-1, num_frames, dtype=int).tolist()
+
+
+def next_index(indices: Sequence[int], position: int) -> Optional[int]:
+    """Smallest index in the sorted `indices` that is >= position, or None"""
+    i = bisect_left(indices, position)
+    return indices[i] if i < len(indices) else None
+
+
+class FrameCursor:
+    """Reads frames of a capture in ascending order, grabbing or seeking as needed"""
+
+    def __init__(self, video, seek_gap: Optional[float] = None):
+        self.video = video
+        self.info = capture_info(video)
+        self.seek_gap = default_seek_gap(self.info["fps"], self.info["total_frames"]) if seek_gap is None else seek_gap
+        # Index of the next frame the decoder will return (None if unknown); a
+        # capture that is already being played starts where it currently is
+        self.position = max(int(video.get(cv2.CAP_PROP_POS_FRAMES)), 0)
+
+    def skip_to(self, index: int) -> Optional[bool]:
+        """Moves to `index` with grab() only; returns whether it seeked, None at EOF"""
+        seeked = self.position is None or index < self.position or index - self.position > self.seek_gap
+        if seeked:
+            self.video.set(cv2.CAP_PROP_POS_FRAMES, index)
+            self.position = index
+
+        while self.position < index:
+            # grab() without retrieve(): no pixel conversion for skipped frames
+            if not self.video.grab():
+                self.position = None
+                return None
+            self.position += 1
+        return seeked
+
+    def read(self, index: int) -> Tuple[Optional[np.ndarray], bool]:
+        """Returns (frame or None, end_of_video)"""
+        seeked = self.skip_to(index)
+        if seeked is None:
+            return None, True
+
+        ret, frame = self.video.read()
+        if not ret:
+            self.position = None
+            total_frames = self.info["total_frames"]
+            if total_frames > 0:
+                # Known length: a failed read before the end is just a bad frame (skip it)
+                return None, index >= total_frames
+            # Unknown length: a failed sequential read is the end of the video
+            return None, not seeked
+
+        self.position += 1
+        return frame, False
+
+
+def sample_capture(video, indices: Iterable[int], seek_gap: Optional[float] = None) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Yields (index, frame) for each index (ascending, repeats allowed) of an
+    already opened capture. `indices` is consumed lazily.
+    """
+    cursor = FrameCursor(video, seek_gap)
+    last_index, last_frame = None, None
+
+    for index in indices:
+        index = int(index)
+        if index == last_index:
+            yield index, last_frame
+            continue
+
+        frame, end = cursor.read(index)
+        if frame is None:
+            if end:
+                return
+            continue
+
+        last_index, last_frame = index, frame
+        yield index, frame
+
+
+def sample_indices(video_path: str, indices: Iterable[int], seek_gap: Optional[float] = None) -> Iterator[Tuple[int, np.ndarray]]:
+    """Yields (index, frame) for explicit frame indices (ascending)"""
+    video = cv2.VideoCapture(video_path)
+    if not video.isOpened():
+        return
+    try:
+        yield from sample_capture(video, indices, seek_gap)
+    finally:
+        video.release()
+
+
+def sample_every_n(video_path: str, n: int, max_frames: Optional[int] = None) -> Iterator[Tuple[int, np.ndarray]]:
+    """Yields every n-th frame (0, n, 2n, ...), at most `max_frames` of them"""
+    video = cv2.VideoCapture(video_path)
+    if not video.isOpened():
+        return
+    try:
+        indices = every_n_indices(capture_info(video)["total_frames"], n, max_frames)
+        yield from sample_capture(video, indices)
+    finally:
+        video.release()
+
+
+def sample_uniform_numbered(video_path: str, num_frames: int) -> Iterator[Tuple[int, int, np.ndarray]]:
+    """
+    Yields (sample, index, frame) for `num_frames` frames evenly spread over the
+    video; `sample` is the position in the plan, stable even if a frame fails
+    """
+    video = cv2.VideoCapture(video_path)
+    if not video.isOpened():
+        return
+    try:
+        indices = uniform_indices(capture_info(video)["total_frames"], num_frames)
+        cursor = FrameCursor(video)
+        last_index, last_frame = None, None
+        for sample, index in enumerate(indices):
+            if index != last_index:
+                last_frame, end = cursor.read(index)
+                last_index = index
+                if end:
+                    return
+            if last_frame is not None:
+                yield sample, index, last_frame
+    finally:
+        video.release()
+
+
+def sample_uniform(video_path: str, num_frames: int) -> Iterator[Tuple[int, np.ndarray]]:
+    """Yields `num_frames` frames evenly spread from the first to the last frame"""
+    for _, index, frame in sample_uniform_numbered(video_path, num_frames):
+        yield index, frame
+
+
+def sample_timestamps(video_path: str, timestamps: Iterable[float]) -> Iterator[Tuple[int, np.ndarray]]:
+    """Yields the frames at the given times in seconds (in ascending order)"""
+    video = cv2.VideoCapture(video_path)
+    if not video.isOpened():
+        return
+    try:
+        info = capture_info(video)
+        if info["fps"] <= 0:
+            return
+        indices = sorted(int(round(t * info["fps"])) for t in timestamps)
+        if info["total_frames"] > 0:
+            indices = [i for i in indices if i < info["total_frames"]]
+        yield from sample_capture(video, indices)
+    finally:
+        video.release()
+
+
+def sample_time_range(video_path: str, start: float = 0.0, end: Optional[float] = None,
+                      step: float = 1.0) -> Iterator[Tuple[int, np.ndarray]]:
+    """Yields one frame every `step` seconds between `start` and `end` (default: end of the video)"""
+    info = video_info(video_path)
+    if info is None or info["fps"] <= 0:
+        return
+    if end is None:
+        end = info["total_frames"] / info["fps"]
+    yield from sample_timestamps(video_path, np.arange(start, end, step))
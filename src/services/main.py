@@ -6,8 +6,9 @@ def main():
     print("2. Smart scene detection")
     print("3. Play video with IA")
     print("4. Youtube player (Need URL)")
+    print("5. Extract + detect + summarise (single decode)")
     
-    choice = input("Choose option (1-4): ")
+    choice = input("Choose option (1-5): ")
     
     if choice == "1":
         import frame_extractor
@@ -50,6 +51,8 @@ def main():
                         print("\n📋 Obtendo apenas informações básicas...")
                         resumo = analyzer.analisar_url_youtube(url, baixar_video=False)
                     
+                    analyzer.fechar()
+                    
                     if 'erro' in resumo:
                         print(f"❌ Erro: {resumo['erro']}")
                     else:
@@ -69,6 +72,18 @@ def main():
         else:
             print("❌ Opção inválida!")
 
+    elif choice == "5":
+        import multi_analyzer
+        import video_player
+        ia = video_player.VideoAI() if video_player.BLIP_DISPONIVEL else None
+        results = multi_analyzer.run_combined_analysis(video_path, 5, ia=ia)
+        if ia is not None:
+            ia.fechar()
+        if results:
+            print(f"Stats: {results['stats']}")
+            if "resumo" in results:
+                print(results["resumo"])
+
     else:
         print("Invalid choice")
 
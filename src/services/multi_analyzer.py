@@ -0,0 +1,254 @@
+import cv2
+import os
+import numpy as np
+from collections import Counter
+from typing import Dict, Optional
+
+import frame_sampler
+
+
+class FrameConsumer:
+    """Base class for analyses fed by MultiAnalyzer (one decode, many consumers)"""
+
+    def start(self, info: Dict):
+        """Called once before decoding, with fps/total_frames/width/height"""
+        pass
+
+    def next_index(self, position: int) -> Optional[int]:
+        """Smallest frame index >= position this consumer wants decoded, None if none"""
+        return None
+
+    def process(self, index: int, frame: np.ndarray):
+        """Receives every frame this consumer asked for"""
+        pass
+
+    @property
+    def done(self) -> bool:
+        """True when this consumer doesn't need any more frames"""
+        return False
+
+    def finish(self):
+        """Called once after decoding, returns the result of the analysis"""
+        return None
+
+
+class IntervalSampler(FrameConsumer):
+    """Saves one frame every `total_frames // num_frames` (same as extract_key_frames)"""
+
+    def __init__(self, num_frames=5, output_folder="extracted_frames"):
+        self.num_frames = num_frames
+        self.output_folder = output_folder
+        self.saved = []
+
+    def start(self, info):
+        if not os.path.exists(self.output_folder):
+            os.makedirs(self.output_folder)
+            print(f"Created folder: {self.output_folder}")
+        frame_interval = max(info["total_frames"] // self.num_frames, 1)
+        self.indices = frame_sampler.every_n_indices(info["total_frames"], frame_interval, self.num_frames)
+
+    def next_index(self, position):
+        return frame_sampler.next_index(self.indices, position)
+
+    def process(self, index, frame):
+        filename = os.path.join(self.output_folder, f"summary_frame_{len(self.saved)}.jpg")
+        cv2.imwrite(filename, frame)
+        print(f"Saved: {filename}")
+        self.saved.append(filename)
+
+    @property
+    def done(self):
+        return len(self.saved) >= self.num_frames
+
+    def finish(self):
+        print(f"Summary complete! Saved {len(self.saved)} key frames in '{self.output_folder}' folder")
+        return self.saved
+
+
+class SceneScorer(FrameConsumer):
+    """Saves frames when the scene changes significantly (same as extract_smart_frames)"""
+
+    def __init__(self, num_frames=5, threshold=30, output_folder="smart_frames"):
+        self.num_frames = num_frames
+        self.threshold = threshold
+        self.output_folder = output_folder
+        self.prev_gray = None
+        self.saved = []
+
+    def start(self, info):
+        if not os.path.exists(self.output_folder):
+            os.makedirs(self.output_folder)
+            print(f"Created folder: {self.output_folder}")
+
+    def next_index(self, position):
+        # Every frame is compared against the last saved scene
+        return position
+
+    def process(self, index, frame):
+        current_gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+        if self.prev_gray is None:
+            change_score = None
+        else:
+            change_score = np.mean(cv2.absdiff(self.prev_gray, current_gray))
+            if change_score <= self.threshold:
+                return
+
+        filename = os.path.join(self.output_folder, f"scene_change_{len(self.saved)}.jpg")
+        cv2.imwrite(filename, frame)
+        if change_score is None:
+            print(f"saved: {filename}")
+        else:
+            print(f"Saved: {filename} (change score: {change_score:.1f})")
+        self.saved.append(filename)
+        self.prev_gray = current_gray
+
+    @property
+    def done(self):
+        return len(self.saved) >= self.num_frames
+
+    def finish(self):
+        print(f"Smart extraction complete! Found {len(self.saved)} scene changes")
+        return self.saved
+
+
+class CaptionSampler(FrameConsumer):
+    """Keeps `num_frames` frames evenly spread over the video for the AI captioning"""
+
+    def __init__(self, num_frames=8):
+        self.num_frames = num_frames
+        self.by_index = {}
+
+    def start(self, info):
+        self.indices = frame_sampler.uniform_indices(info["total_frames"], self.num_frames)
+        # linspace repeats indices when the video has fewer frames than asked
+        self.repeats = Counter(self.indices)
+
+    def next_index(self, position):
+        return frame_sampler.next_index(self.indices, position)
+
+    def process(self, index, frame):
+        # The same index can arrive twice (e.g. read ahead, then reached by playback)
+        if index not in self.by_index:
+            self.by_index[index] = frame.copy()
+
+    @property
+    def frames(self):
+        """Stored frames in plan order, repeated indices included"""
+        return [self.by_index[index] for index in self.indices if index in self.by_index]
+
+    @property
+    def remaining(self):
+        return sum(count for index, count in self.repeats.items() if index not in self.by_index)
+
+    @property
+    def done(self):
+        return self.remaining <= 0
+
+    def finish(self):
+        return self.frames
+
+
+class VideoStatistics(FrameConsumer):
+    """Basic statistics of the video: length from the metadata, brightness from a few samples"""
+
+    def __init__(self, num_samples=8):
+        self.num_samples = num_samples
+        self.brightness = []
+
+    def start(self, info):
+        self.info = info
+        self.indices = frame_sampler.uniform_indices(info["total_frames"], self.num_samples)
+
+    def next_index(self, position):
+        return frame_sampler.next_index(self.indices, position)
+
+    def process(self, index, frame):
+        # Every 8th pixel is plenty for an average
+        self.brightness.append(float(np.mean(frame[::8, ::8])))
+
+    @property
+    def done(self):
+        return len(self.brightness) >= len(set(self.indices))
+
+    def finish(self):
+        fps = self.info["fps"]
+        return {
+            "fps": fps,
+            "width": self.info["width"],
+            "height": self.info["height"],
+            "total_frames": self.info["total_frames"],
+            "duration_s": self.info["total_frames"] / fps if fps else 0,
+            "mean_brightness": float(np.mean(self.brightness)) if self.brightness else 0.0,
+        }
+
+
+class MultiAnalyzer:
+    """Decodes a video once and feeds every registered consumer"""
+
+    def __init__(self):
+        self.consumers = {}
+
+    def register(self, name: str, consumer: FrameConsumer):
+        self.consumers[name] = consumer
+        return consumer
+
+    def run(self, video_path: str) -> Dict:
+        """Runs all consumers over a single pass of the video, returns {name: result}"""
+
+        video = cv2.VideoCapture(video_path)
+        if not video.isOpened():
+            print("Ops! Couldn't open the file")
+            return {}
+
+        info = {
+            "total_frames": int(video.get(cv2.CAP_PROP_FRAME_COUNT)),
+            "fps": video.get(cv2.CAP_PROP_FPS),
+            "width": int(video.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(video.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        }
+        for consumer in self.consumers.values():
+            consumer.start(info)
+
+        # The next wanted index is only computed after the previous frame was
+        # processed, so consumers that finish early stop asking for frames
+        def wanted_indices():
+            position = 0
+            while True:
+                wanted = [c.next_index(position) for c in self.consumers.values() if not c.done]
+                wanted = [index for index in wanted if index is not None]
+                if not wanted:
+                    return
+                index = min(wanted)
+                yield index
+                position = index + 1
+
+        # Frames nobody wants are skipped with grab() (or a seek when far away)
+        try:
+            for index, frame in frame_sampler.sample_capture(video, wanted_indices()):
+                for consumer in self.consumers.values():
+                    if not consumer.done and consumer.next_index(index) == index:
+                        consumer.process(index, frame)
+        finally:
+            video.release()
+        return {name: consumer.finish() for name, consumer in self.consumers.items()}
+
+
+def run_combined_analysis(video_path: str, num_frames: int = 5, num_ai_frames: int = 6,
+                          threshold: int = 30, ia=None) -> Dict:
+    """Extract + scene detection + AI summary decoding each frame only once"""
+
+    analyzer = MultiAnalyzer()
+    analyzer.register("frames", IntervalSampler(num_frames))
+    analyzer.register("scenes", SceneScorer(num_frames, threshold))
+    analyzer.register("captions", CaptionSampler(num_ai_frames))
+    analyzer.register("stats", VideoStatistics())
+
+    results = analyzer.run(video_path)
+    if not results:
+        return results
+
+    if ia is not None:
+        results["resumo"] = ia.resumir_frames(results["captions"], os.path.basename(video_path))
+
+    return results
@@ -0,0 +1,232 @@
+import os
+import time
+import threading
+import cv2
+import numpy as np
+from typing import Iterator, Optional, Tuple
+
+import frame_sampler
+
+try:
+    import yt_dlp
+    from yt_dlp.utils import DownloadCancelled
+    YTDLP_DISPONIVEL = True
+except ImportError:
+    YTDLP_DISPONIVEL = False
+
+# MP4 com o "moov" no início pode ser lido enquanto ainda está sendo escrito
+FORMATO_PROGRESSIVO = "worst[height<=?480][ext=mp4]/worst[height<=?480]/worst"
+
+# O arquivo em andamento nunca usa o nome final: um download interrompido
+# não pode ser confundido com um vídeo completo na próxima execução.
+# O modo progressivo não retoma parciais: cada execução baixa do zero
+SUFIXO_PARCIAL = ".parcial"
+
+
+class DownloadProgressivo:
+    def __init__(self, url: str, pasta_destino: str, nome_base: str, qualidade: str = FORMATO_PROGRESSIVO):
+        """
+        Baixa o vídeo numa thread, escrevendo direto num arquivo parcial legível
+        (sem .part do yt-dlp) que é renomeado para o nome final ao terminar.
+        Um parcial deixado por execução anterior é apagado (não é retomado);
+        use cancelar() antes de abandonar o download.
+        """
+        self.url = url
+        self.pasta_destino = pasta_destino
+        self.nome_base = nome_base
+        self.caminho_modelo = os.path.join(pasta_destino, f"{nome_base}{SUFIXO_PARCIAL}.%(ext)s")
+        self.qualidade = qualidade
+        self.caminho = None
+        self.bytes_baixados = 0
+        self.bytes_total = 0
+        self.terminado = False
+        self.erro = None
+        self._cancelado = threading.Event()
+        self._thread = threading.Thread(target=self._baixar, daemon=True)
+
+    def _progresso(self, d):
+        if self._cancelado.is_set():
+            # O yt-dlp interrompe o download quando um hook levanta DownloadCancelled
+            raise DownloadCancelled("download cancelado")
+        self.caminho = d.get('filename', self.caminho)
+        self.bytes_baixados = d.get('downloaded_bytes') or self.bytes_baixados
+        self.bytes_total = d.get('total_bytes') or d.get('total_bytes_estimate') or self.bytes_total
+
+    def _remover_parciais(self):
+        """Um parcial de execução anterior não tem como ser validado: recomeça do zero"""
+        prefixo = f"{self.nome_base}{SUFIXO_PARCIAL}"
+        for arquivo in os.listdir(self.pasta_destino):
+            if arquivo.startswith(prefixo):
+                os.remove(os.path.join(self.pasta_destino, arquivo))
+
+    def _baixar(self):
+        ydl_opts = {
+            'format': self.qualidade,
+            'outtmpl': self.caminho_modelo,
+            'quiet': True,
+            'nopart': True,
+            'progress_hooks': [self._progresso],
+        }
+        try:
+            self._remover_parciais()
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                ydl.download([self.url])
+            if self._cancelado.is_set():
+                raise DownloadCancelled("download cancelado")
+            if not self.caminho or not os.path.exists(self.caminho):
+                raise RuntimeError("arquivo baixado não encontrado")
+
+            # Só o download completo recebe o nome final
+            pasta, nome = os.path.split(self.caminho)
+            caminho_final = os.path.join(pasta, nome.replace(SUFIXO_PARCIAL, "", 1))
+            os.replace(self.caminho, caminho_final)
+            self.caminho = caminho_final
+        except Exception as e:
+            self.erro = str(e)
+        finally:
+            self.terminado = True
+
+    def iniciar(self):
+        self._thread.start()
+        return self
+
+    def aguardar(self):
+        self._thread.join()
+        return self.caminho if self.erro is None else None
+
+    def cancelar(self):
+        """Interrompe o download (se ainda estiver rodando) e espera a thread terminar"""
+        self._cancelado.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def fracao(self) -> float:
+        """Fração do arquivo já escrita em disco (1.0 quando terminou)"""
+        if self.terminado and self.erro is None:
+            return 1.0
+        if not self.bytes_total:
+            return 0.0
+        return min(self.bytes_baixados / self.bytes_total, 1.0)
+
+
+def _abrir_parcial(download: DownloadProgressivo, intervalo: float):
+    """Espera o cabeçalho do vídeo chegar e retorna a captura aberta"""
+    while True:
+        terminado = download.terminado
+        caminho = download.caminho
+        if caminho and os.path.exists(caminho):
+            video = cv2.VideoCapture(caminho)
+            if video.isOpened() and frame_sampler.capture_info(video)["total_frames"] > 0:
+                return video
+            video.release()
+        if terminado:
+            return None
+        time.sleep(intervalo)
+
+
+def _ler_confirmado(cursor: frame_sampler.FrameCursor, indice: int, confirmar: int,
+                    terminado: bool) -> Optional[np.ndarray]:
+    """
+    Lê o frame `indice`. Durante o download, só aceita o frame se os `confirmar`
+    frames seguintes também decodificam: assim ele não está na parte ainda
+    sendo escrita (que pode decodificar corrompida)
+    """
+    frame, _ = cursor.read(indice)
+    if frame is None or terminado:
+        return frame
+
+    total_frames = cursor.info["total_frames"]
+    alvo = indice + confirmar
+    if alvo >= total_frames:
+        # O fim do vídeo só é confiável com o download completo
+        return None
+    if cursor.skip_to(alvo) is None or not cursor.video.grab():
+        cursor.position = None
+        return None
+    cursor.position += 1
+    return frame
+
+
+def frames_progressivos(download: DownloadProgressivo, num_frames: int = 8, margem: float = 0.02,
+                        intervalo: float = 0.2) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Gera (amostra, frame) dos `num_frames` frames distribuídos no vídeo, cada um
+    assim que a parte correspondente do arquivo já foi baixada. `amostra` é a
+    mesma numeração de frame_sampler.sample_uniform_numbered.
+    Args:
+        download: Download em andamento
+        margem: Fração extra esperada além da posição do frame antes de tentar ler
+        intervalo: Segundos entre verificações do progresso
+    """
+    video = _abrir_parcial(download, intervalo)
+    if video is None:
+        return
+
+    cursor = frame_sampler.FrameCursor(video)
+    total_frames = cursor.info["total_frames"]
+    # Um segundo de vídeo à frente precisa decodificar para confirmar o frame
+    confirmar = max(int(cursor.info["fps"]), 1)
+
+    try:
+        ultimo_indice, ultimo_frame = None, None
+        for amostra, indice in enumerate(frame_sampler.uniform_indices(total_frames, num_frames)):
+            if indice == ultimo_indice:
+                if ultimo_frame is not None:
+                    yield amostra, ultimo_frame
+                continue
+
+            # Bytes não são lineares no tempo: a fração só decide quando tentar
+            necessario = min((indice + 1) / total_frames + margem, 1.0)
+            while download.fracao() < necessario and not download.terminado:
+                time.sleep(intervalo)
+
+            while True:
+                terminado = download.terminado
+                frame = _ler_confirmado(cursor, indice, confirmar, terminado)
+                if frame is not None or terminado:
+                    break
+                # Os dados ainda não chegaram: espera e reabre o arquivo, que cresceu
+                time.sleep(intervalo)
+                video.release()
+                video = cv2.VideoCapture(download.caminho)
+                cursor = frame_sampler.FrameCursor(video)
+
+            if frame is None and terminado:
+                # Última tentativa com o arquivo completo (e já renomeado)
+                video.release()
+                video = cv2.VideoCapture(download.caminho)
+                cursor = frame_sampler.FrameCursor(video)
+                frame, _ = cursor.read(indice)
+
+            ultimo_indice, ultimo_frame = indice, frame
+            if frame is not None:
+                yield amostra, frame
+    finally:
+        video.release()
+
+
+def servir_arquivo_lento(pasta: str, bytes_por_segundo: int = 256 * 1024, porta: int = 0):
+    """
+    Servidor HTTP local que entrega arquivos de `pasta` devagar, para testar
+    a análise progressiva sem o YouTube. Retorna o servidor (use .shutdown());
+    a porta escolhida fica em servidor.server_address[1].
+    """
+    import functools
+    from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+    class HandlerLento(SimpleHTTPRequestHandler):
+        def copyfile(self, origem, destino):
+            bloco = max(bytes_por_segundo // 10, 1)
+            while True:
+                dados = origem.read(bloco)
+                if not dados:
+                    break
+                destino.write(dados)
+                time.sleep(0.1)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", porta), functools.partial(HandlerLento, directory=pasta))
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
@@ -57,4 +57,5 @@ def extract_smart_frames(video_path, num_frames=5, threshold=30, output_folders=
     video.release()
     print(f"Smart extraction complete! Found {saved_count} scene changes")
 
-extract_smart_frames("../../video.mp4", 30, threshold=30)
\ No newline at end of file
+if __name__ == "__main__":
+    extract_smart_frames("../../video.mp4", 30, threshold=30)
\ No newline at end of file
@@ -1,12 +1,15 @@
 import cv2
 import os
 import numpy as np
+import frame_sampler
+from multi_analyzer import CaptionSampler
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 try:
     from transformers import BlipProcessor, BlipForConditionalGeneration
-    from PIL import Image
+    from blip_preprocess import PreprocessadorBLIP, dividir_em_lotes
+    from caption_pool import PoolLegendas, legendar_lote
     BLIP_DISPONIVEL = True
     print("✅ BLIP carregado com sucesso!")
 except ImportError:
@@ -14,38 +17,32 @@ except ImportError:
     print("❌ Para usar IA, instale: pip install transformers torch pillow")
 
 class VideoAI:
-    def __init__(self):
-        """Inicializa a IA BLIP"""
+    def __init__(self, num_workers: Optional[int] = 0, modo: str = "throughput"):
+        """Inicializa a IA BLIP (num_workers None ou > 0 legenda em processos separados, ver PoolLegendas)"""
         
         if BLIP_DISPONIVEL:
             print("Carregando modelo BLIP (pode demorar na primeira vez)... ")
             self.processor = BlipProcessor.from_pretrained("Salesforce/blip-image-captioning-base")
             self.model = BlipForConditionalGeneration.from_pretrained("Salesforce/blip-image-captioning-base")
+            self.preprocessador = PreprocessadorBLIP(self.processor)
             print("✅ Modelo BLIP carregado!")
+            usar_pool = num_workers is None or num_workers > 0
+            self.pool = PoolLegendas(self.processor, self.model, num_workers, modo) if usar_pool else None
         else:
             self.processor = None
             self.model = None
+            self.preprocessador = None
+            self.pool = None
 
     def extrair_frames_chave(self, caminho_video: str, num_frames: int = 8) -> List[np.ndarray]:
         """Extrai frames importantes do vídeo"""
+        return [frame for _, frame in frame_sampler.sample_uniform(caminho_video, num_frames)]
 
-        video = cv2.VideoCapture(caminho_video)
-        if not video.isOpened():
-            return []
-        
-        total_frames = int(video.get(cv2.CAP_PROP_FRAME_COUNT))
-        indices_frames = np.linspace(0, total_frames-1, num_frames, dtype=int)
-        
-        frames = []
-        for idx in indices_frames:
-            video.set(cv2.CAP_PROP_POS_FRAMES, idx)
-            ret, frame = video.read()
-
-            if ret:
-                frames.append(frame)
-            
-        video.release()
-        return frames
+    def fechar(self):
+        """Encerra os processos de legenda, se houver"""
+        if self.pool is not None:
+            self.pool.fechar()
+            self.pool = None
 
     def analisar_frame(self, frame: np.ndarray) -> str:
         """Analisa um frame individual"""
@@ -53,14 +50,22 @@ class VideoAI:
         if not BLIP_DISPONIVEL or self.model is None:
             return "Modelo não disponível"
         
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        imagem_pil = Image.fromarray(frame_rgb)
+        return self.analisar_frames([frame])[0]
+
+    def analisar_frames(self, frames: List[np.ndarray]) -> List[str]:
+        """Analisa vários frames em lotes de tamanho limitado"""
+
+        if not BLIP_DISPONIVEL or self.model is None:
+            return ["Modelo não disponível"] * len(frames)
 
-        inputs = self.processor(imagem_pil, return_tensors="pt")
-        output = self.model.generate(**inputs, max_length=50, num_beams=5)
-        descricao = self.processor.decode(output[0], skip_special_tokens=True)
+        if self.pool is not None:
+            return self.pool.legendar(frames)
 
-        return descricao
+        # num_frames vem do usuário: um único generate com beams teria memória sem limite
+        descricoes = []
+        for lote in dividir_em_lotes(frames):
+            descricoes.extend(legendar_lote(self.processor, self.model, self.preprocessador, lote))
+        return descricoes
     
     def resumir_video(self, caminho_video: str, num_frames: int = 8) -> str:
         """Analisa e resume o video completo"""
@@ -69,6 +74,10 @@ class VideoAI:
         print(f"📊 Extraindo {num_frames} frames principais...")
 
         frames = self.extrair_frames_chave(caminho_video, num_frames)
+        return self.resumir_frames(frames, os.path.basename(caminho_video))
+
+    def resumir_frames(self, frames: List[np.ndarray], nome_video: str) -> str:
+        """Resume frames já extraídos (ex: pelo MultiAnalyzer, sem decodificar de novo)"""
 
         if not frames:
             return "❌ Erro: Não conseguiu extrair frames do vídeo"
@@ -76,14 +85,12 @@ class VideoAI:
         print(f"🤖 Analisando {len(frames)} frames com IA...")
 
         descricoes = []
-        for i, frame in enumerate(frames):
-            print(f"   Analisando frame {i+1}/{len(frames)}...")
-            descricao = self.analisar_frame(frame)
+        for i, descricao in enumerate(self.analisar_frames(frames)):
             descricoes.append(f"🎞️ Frame {i+1}: {descricao}")
 
         resumo = f"📹 RESUMO DO VÍDEO\n"
         resumo += f"{'='*50}\n"
-        resumo += f"Arquivo: {os.path.basename(caminho_video)}\n"
+        resumo += f"Arquivo: {nome_video}\n"
         resumo += f"Frames analisados: {len(frames)}\n"
         resumo += f"Data da análise: {datetime.now().strftime('%d/%m/%Y %H:%M')}\n\n"
         resumo += "🔍 DESCRIÇÕES POR FRAME:\n"
@@ -105,6 +112,22 @@ class VideoAI:
         
         return resumo
     
+def guardar_frame_ia(amostrador: CaptionSampler, indice: int, frame: np.ndarray):
+    """Entrega o frame da reprodução ao amostrador, se ele ainda precisa dele"""
+    if not amostrador.done and amostrador.next_index(indice) == indice:
+        amostrador.process(indice, frame)
+
+
+def completar_amostrador(video, amostrador: CaptionSampler, posicao: int):
+    """Lê na mesma captura os frames da IA que a reprodução ainda não alcançou e volta para `posicao`"""
+    if amostrador.done:
+        return
+    faltando = sorted(set(i for i in amostrador.indices if i >= posicao))
+    for indice, frame in frame_sampler.sample_capture(video, faltando):
+        amostrador.process(indice, frame)
+    video.set(cv2.CAP_PROP_POS_FRAMES, posicao)
+
+
 def player_com_ia(caminho_video: str, pasta_salvar: str = "frames_salvos"):
     """Player de vídeo com análise de IA"""
 
@@ -129,6 +152,10 @@ def player_com_ia(caminho_video: str, pasta_salvar: str = "frames_salvos"):
     frames_salvos = 0
 
     ia = VideoAI()
+
+    # Os frames da IA são guardados durante a reprodução, sem reabrir o arquivo
+    amostrador = CaptionSampler(num_frames=6)
+    amostrador.start(frame_sampler.capture_info(video))
     
     while True:
         if not pausado:
@@ -137,6 +164,7 @@ def player_com_ia(caminho_video: str, pasta_salvar: str = "frames_salvos"):
             if not ret:
                 print("🏁 Fim do vídeo!")
                 break
+            guardar_frame_ia(amostrador, contador_frame, frame)
             contador_frame += 1
         
         cv2.imshow("🤖 Player com IA", frame)
@@ -168,9 +196,10 @@ def player_com_ia(caminho_video: str, pasta_salvar: str = "frames_salvos"):
         elif tecla == ord('i'):
             if BLIP_DISPONIVEL:
                 print("🤖 Iniciando análise com IA...")
-                video.set(cv2.CAP_PROP_POS_FRAMES, 0)
 
-                resumo = ia.resumir_video(caminho_video, num_frames=6)
+                completar_amostrador(video, amostrador, contador_frame)
+
+                resumo = ia.resumir_frames(amostrador.frames, os.path.basename(caminho_video))
                 print("\n" + "="*60)
                 print(resumo)
                 print("="*60 + "\n")
@@ -185,5 +214,6 @@ def player_com_ia(caminho_video: str, pasta_salvar: str = "frames_salvos"):
 
     cv2.destroyAllWindows()
     video.release()
+    ia.fechar()
     print(f"🏁 Player fechado. Frames salvos: {frames_salvos}")
     return True
\ No newline at end of file
@@ -1,11 +1,25 @@
 import os
 import cv2
 import numpy as np
+import frame_sampler
 from datetime import datetime
 from typing import List, Dict, Optional
 import json
 import re
 
+from checkpoint import JobCheckpoint
+from progressive import DownloadProgressivo, frames_progressivos, SUFIXO_PARCIAL
+
+# Frames legendados entre dois checkpoints
+LOTE_CHECKPOINT = 4
+
+# Texto mostrado no resumo para frames cuja legenda falhou
+LEGENDA_FALHOU = "Erro na análise"
+
+
+class ErroAnaliseIA(Exception):
+    """Falha ao legendar frames com o BLIP"""
+
 # Para download do YouTube
 try:
     import yt_dlp
@@ -18,7 +32,8 @@ except ImportError:
 # Para IA local
 try:
     from transformers import BlipProcessor, BlipForConditionalGeneration
-    from PIL import Image
+    from blip_preprocess import PreprocessadorBLIP, dividir_em_lotes
+    from caption_pool import PoolLegendas, legendar_lote
     BLIP_DISPONIVEL = True
     print("✅ BLIP disponível!")
 except ImportError:
@@ -26,18 +41,22 @@ except ImportError:
     print("❌ Para IA, instale: pip install transformers torch pillow")
 
 class YouTubeVideoAnalyzer:
-    def __init__(self, pasta_downloads: str = "youtube_downloads"):
+    def __init__(self, pasta_downloads: str = "youtube_downloads", num_workers: Optional[int] = 0, modo: str = "throughput"):
         """
         Analisador de vídeos do YouTube com IA
         Args:
             pasta_downloads: Pasta onde salvar os vídeos baixados
+            num_workers: Processos de legenda (0 = legenda no próprio processo, None = escolhido pelo modo)
+            modo: "throughput" ou "latency" (ver PoolLegendas)
         """
+        self.pool = None
         self.pasta_downloads = pasta_downloads
         self.pasta_frames = os.path.join(pasta_downloads, "frames")
         self.pasta_resumos = os.path.join(pasta_downloads, "resumos")
+        self.pasta_jobs = os.path.join(pasta_downloads, "jobs")
         
         # Criar pastas necessárias
-        for pasta in [self.pasta_downloads, self.pasta_frames, self.pasta_resumos]:
+        for pasta in [self.pasta_downloads, self.pasta_frames, self.pasta_resumos, self.pasta_jobs]:
             if not os.path.exists(pasta):
                 os.makedirs(pasta)
                 print(f"📁 Pasta criada: {pasta}")
@@ -48,6 +67,7 @@ class YouTubeVideoAnalyzer:
             try:
                 self.processor = BlipProcessor.from_pretrained("Salesforce/blip-image-captioning-base")
                 self.model = BlipForConditionalGeneration.from_pretrained("Salesforce/blip-image-captioning-base")
+                self.preprocessador = PreprocessadorBLIP(self.processor)
                 print("✅ Modelo BLIP carregado!")
                 self.ia_disponivel = True
             except Exception as e:
@@ -55,6 +75,16 @@ class YouTubeVideoAnalyzer:
                 self.ia_disponivel = False
         else:
             self.ia_disponivel = False
+        
+        # Fora do try: configuração inválida do pool (ex: modo "latency" com 4 workers) deve aparecer
+        if self.ia_disponivel and (num_workers is None or num_workers > 0):
+            self.pool = PoolLegendas(self.processor, self.model, num_workers, modo)
+    
+    def fechar(self):
+        """Encerra os processos de legenda, se houver"""
+        if self.pool is not None:
+            self.pool.fechar()
+            self.pool = None
     
     def obter_info_video(self, url: str) -> Dict:
         """Obtém informações do vídeo do YouTube"""
@@ -85,12 +115,13 @@ class YouTubeVideoAnalyzer:
         except Exception as e:
             return {"erro": f"Erro ao obter informações: {str(e)}"}
     
-    def baixar_video(self, url: str, qualidade: str = "worst[height<=480]") -> str:
+    def baixar_video(self, url: str, qualidade: str = "worst[height<=480]", nome_base: str = None) -> str:
         """
         Baixa vídeo do YouTube
         Args:
             url: URL do vídeo
             qualidade: Qualidade do vídeo (worst[height<=480] para economia)
+            nome_base: Nome fixo do arquivo (permite continuar um download interrompido)
         Returns:
             Caminho do arquivo baixado
         """
@@ -99,14 +130,16 @@ class YouTubeVideoAnalyzer:
             return None
         
         # Gerar nome de arquivo seguro
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        nome_arquivo = f"video_{timestamp}.%(ext)s"
+        if nome_base is None:
+            nome_base = f"video_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        nome_arquivo = f"{nome_base}.%(ext)s"
         caminho_arquivo = os.path.join(self.pasta_downloads, nome_arquivo)
         
         ydl_opts = {
             'format': qualidade,  # Baixa em qualidade menor para economia
             'outtmpl': caminho_arquivo,
             'quiet': False,
+            'continuedl': True,  # Continua o .part de uma execução anterior
         }
         
         try:
@@ -115,9 +148,9 @@ class YouTubeVideoAnalyzer:
                 ydl.download([url])
             
             # Encontrar o arquivo baixado
-            base_nome = nome_arquivo.replace('.%(ext)s', '')
             for arquivo in os.listdir(self.pasta_downloads):
-                if arquivo.startswith(f"video_{timestamp}"):
+                if (arquivo.startswith(nome_base) and not arquivo.endswith(('.part', '.ytdl'))
+                        and SUFIXO_PARCIAL not in arquivo):
                     caminho_final = os.path.join(self.pasta_downloads, arquivo)
                     print(f"✅ Vídeo baixado: {arquivo}")
                     return caminho_final
@@ -130,26 +163,7 @@ class YouTubeVideoAnalyzer:
     
     def extrair_frames_chave(self, caminho_video: str, num_frames: int = 10) -> List[np.ndarray]:
         """Extrai frames importantes do vídeo"""
-        video = cv2.VideoCapture(caminho_video)
-        if not video.isOpened():
-            return []
-        
-        total_frames = int(video.get(cv2.CAP_PROP_FRAME_COUNT))
-        if total_frames == 0:
-            return []
-        
-        # Distribuir frames ao longo do vídeo
-        indices_frames = np.linspace(0, total_frames-1, num_frames, dtype=int)
-        
-        frames = []
-        for idx in indices_frames:
-            video.set(cv2.CAP_PROP_POS_FRAMES, idx)
-            ret, frame = video.read()
-            if ret:
-                frames.append(frame)
-        
-        video.release()
-        return frames
+        return [frame for _, frame in frame_sampler.sample_uniform(caminho_video, num_frames)]
     
     def analisar_frame_ia(self, frame: np.ndarray) -> str:
         """Analisa um frame com IA"""
@@ -157,50 +171,130 @@ class YouTubeVideoAnalyzer:
             return "IA não disponível"
         
         try:
-            # Converter BGR para RGB
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            imagem_pil = Image.fromarray(frame_rgb)
-            
-            # Gerar descrição
-            inputs = self.processor(imagem_pil, return_tensors="pt")
-            output = self.model.generate(**inputs, max_length=50, num_beams=5)
-            descricao = self.processor.decode(output[0], skip_special_tokens=True)
+            return self.analisar_frames_ia([frame])[0]
+        except ErroAnaliseIA as e:
+            return f"{LEGENDA_FALHOU}: {str(e)}"
+    
+    def analisar_frames_ia(self, frames: List[np.ndarray]) -> List[str]:
+        """Analisa vários frames com IA em lotes de tamanho limitado (levanta ErroAnaliseIA se falhar)"""
+        if not self.ia_disponivel:
+            raise ErroAnaliseIA("IA não disponível")
+        
+        try:
+            if self.pool is not None:
+                return self.pool.legendar(frames)
             
-            return descricao
+            descricoes = []
+            for lote in dividir_em_lotes(frames):
+                # BGR -> pixel_values direto em NumPy, sem PIL; mesmo caminho dos workers do pool
+                descricoes.extend(legendar_lote(self.processor, self.model, self.preprocessador, lote))
+            return descricoes
         except Exception as e:
-            return f"Erro na análise: {str(e)}"
+            raise ErroAnaliseIA(str(e)) from e
+    
+    def _legendar_com_checkpoint(self, amostras: Dict[int, np.ndarray], job: JobCheckpoint) -> Dict[int, Optional[str]]:
+        """Legenda só as amostras que ainda não estão no checkpoint, salvando a cada lote (None = falhou)"""
+        legendas = job.get('legendas', {})
+        pendentes = [a for a in amostras if str(a) not in legendas]
+        if len(pendentes) < len(amostras):
+            print(f"♻️ {len(amostras) - len(pendentes)} frames já legendados no checkpoint")
+        
+        for inicio in range(0, len(pendentes), LOTE_CHECKPOINT):
+            lote = pendentes[inicio:inicio + LOTE_CHECKPOINT]
+            print(f"   Analisando frames {lote[0]+1}-{lote[-1]+1}...")
+            try:
+                descricoes = self.analisar_frames_ia([amostras[a] for a in lote])
+            except ErroAnaliseIA as e:
+                # Erros não entram no checkpoint para serem tentados de novo
+                print(f"❌ Erro na análise: {str(e)}")
+                continue
+            for a, descricao in zip(lote, descricoes):
+                legendas[str(a)] = descricao
+            job.salvar(legendas=legendas)
+        
+        return {a: legendas.get(str(a)) for a in amostras}
     
-    def gerar_resumo_video(self, caminho_video: str, info_video: Dict, num_frames: int = 8) -> Dict:
-        """Gera resumo completo do vídeo"""
+    def gerar_resumo_video(self, caminho_video: str, info_video: Dict, num_frames: int = 8,
+                           job: Optional[JobCheckpoint] = None) -> Dict:
+        """Gera resumo completo do vídeo (com `job`, retoma legendas e frames já feitos)"""
         print(f"🎬 Analisando vídeo: {info_video.get('titulo', 'Vídeo sem título')}")
         print(f"📊 Extraindo {num_frames} frames para análise...")
         
-        frames = self.extrair_frames_chave(caminho_video, num_frames)
-        if not frames:
+        # Chave = posição da amostra no plano: a mesma no modo progressivo e no checkpoint
+        amostras = {a: frame for a, _, frame in frame_sampler.sample_uniform_numbered(caminho_video, num_frames)}
+        if not amostras:
             return {"erro": "Não foi possível extrair frames"}
         
-        print(f"🤖 Analisando {len(frames)} frames com IA...")
+        print(f"🤖 Analisando {len(amostras)} frames com IA...")
         
         # Analisar frames com IA
-        descricoes_frames = []
+        descricoes = None
         if self.ia_disponivel:
-            for i, frame in enumerate(frames):
-                print(f"   Analisando frame {i+1}/{len(frames)}...")
-                descricao = self.analisar_frame_ia(frame)
+            if job is not None:
+                descricoes = self._legendar_com_checkpoint(amostras, job)
+            else:
+                try:
+                    descricoes = dict(zip(amostras, self.analisar_frames_ia(list(amostras.values()))))
+                except ErroAnaliseIA as e:
+                    print(f"❌ Erro na análise: {str(e)}")
+                    descricoes = dict.fromkeys(amostras)
+        
+        return self._montar_resumo(amostras, descricoes, info_video, num_frames, job)
+    
+    def gerar_resumo_progressivo(self, download: DownloadProgressivo, info_video: Dict, num_frames: int = 8,
+                                 job: Optional[JobCheckpoint] = None) -> Dict:
+        """Gera o resumo legendando cada frame assim que a parte dele foi baixada"""
+        print(f"🎬 Analisando durante o download: {info_video.get('titulo', 'Vídeo sem título')}")
+        
+        legendas = job.get('legendas', {}) if job is not None else {}
+        amostras = {}
+        descricoes = {}
+        for amostra, frame in frames_progressivos(download, num_frames):
+            amostras[amostra] = frame
+            if not self.ia_disponivel:
+                continue
+            
+            descricao = legendas.get(str(amostra))
+            if descricao is None:
+                print(f"   Analisando frame {amostra+1}/{num_frames} ({download.fracao():.0%} baixado)...")
+                try:
+                    descricao = self.analisar_frames_ia([frame])[0]
+                except ErroAnaliseIA as e:
+                    print(f"❌ Erro na análise: {str(e)}")
+                else:
+                    if job is not None:
+                        legendas[str(amostra)] = descricao
+                        job.salvar(legendas=legendas)
+            descricoes[amostra] = descricao
+        
+        if not amostras:
+            return {"erro": "Não foi possível extrair frames"}
+        
+        return self._montar_resumo(amostras, descricoes if self.ia_disponivel else None, info_video, num_frames, job)
+    
+    def _montar_resumo(self, amostras: Dict[int, np.ndarray], descricoes: Optional[Dict[int, Optional[str]]], info_video: Dict,
+                       num_frames: int, job: Optional[JobCheckpoint] = None) -> Dict:
+        """Salva frames de exemplo e monta o dicionário final do resumo"""
+        descricoes_frames = []
+        if descricoes is not None:
+            for a, descricao in descricoes.items():
                 descricoes_frames.append({
-                    'frame': i+1,
-                    'tempo_aproximado': f"{(i * info_video.get('duracao', 0) / len(frames) / 60):.1f}min",
-                    'descricao': descricao
+                    'frame': a+1,
+                    'tempo_aproximado': f"{(a * info_video.get('duracao', 0) / num_frames / 60):.1f}min",
+                    'descricao': descricao if descricao is not None else LEGENDA_FALHOU
                 })
         else:
             descricoes_frames = [{"erro": "IA não disponível para análise de frames"}]
         
         # Salvar alguns frames como exemplo
         frames_salvos = []
-        for i, frame in enumerate(frames[:5]):  # Salvar apenas 5 frames
-            nome_frame = f"frame_{i+1:02d}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jpg"
+        for a, frame in list(amostras.items())[:5]:  # Salvar apenas 5 frames
+            sufixo = job.id_job if job is not None else datetime.now().strftime('%Y%m%d_%H%M%S')
+            nome_frame = f"frame_{a+1:02d}_{sufixo}.jpg"
             caminho_frame = os.path.join(self.pasta_frames, nome_frame)
-            if cv2.imwrite(caminho_frame, frame):
+            if job is not None and os.path.exists(caminho_frame):
+                frames_salvos.append(nome_frame)
+            elif cv2.imwrite(caminho_frame, frame):
                 frames_salvos.append(nome_frame)
         
         # Análise de palavras-chave
@@ -219,7 +313,8 @@ class YouTubeVideoAnalyzer:
             'info_video': info_video,
             'analise': {
                 'data_analise': datetime.now().isoformat(),
-                'total_frames_analisados': len(frames),
+                'total_frames_analisados': len(amostras),
+                'frames_com_erro': sum(1 for d in (descricoes or {}).values() if d is None),
                 'frames_salvos': frames_salvos,
                 'ia_disponivel': self.ia_disponivel
             },
@@ -289,13 +384,15 @@ class YouTubeVideoAnalyzer:
         
         return caminho_txt
     
-    def analisar_url_youtube(self, url: str, baixar_video: bool = True, num_frames: int = 8) -> Dict:
+    def analisar_url_youtube(self, url: str, baixar_video: bool = True, num_frames: int = 8,
+                             progressivo: bool = False) -> Dict:
         """
         Função principal - analisa vídeo do YouTube completo
         Args:
             url: URL do vídeo do YouTube
             baixar_video: Se deve baixar o vídeo (True) ou usar apenas metadados (False)
             num_frames: Número de frames para análise visual
+            progressivo: Legenda os frames enquanto o vídeo ainda está sendo baixado
         Returns:
             Dicionário com resumo completo
         """
@@ -320,21 +417,59 @@ class YouTubeVideoAnalyzer:
                 'analise_visual': False
             }
         
+        # Mesmas entradas = mesmo job: o progresso anterior é reaproveitado
+        job = JobCheckpoint(self.pasta_jobs, {'url': url, 'num_frames': num_frames})
+        if job.concluida('resumo'):
+            print(f"✅ Análise já concluída anteriormente (job {job.id_job})")
+            return job.get('resumo')
+        
         # 2. Baixar vídeo
-        print("\n📥 Baixando vídeo...")
-        caminho_video = self.baixar_video(url)
-        if not caminho_video:
-            return {"erro": "Falha ao baixar vídeo"}
+        resumo = None
+        caminho_video = job.get('caminho_video')
+        if job.concluida('download') and caminho_video and os.path.exists(caminho_video):
+            print(f"\n♻️ Vídeo já baixado: {caminho_video}")
+        elif progressivo:
+            # 2+3. Baixar e analisar ao mesmo tempo
+            if not YTDLP_DISPONIVEL:
+                return {"erro": "yt-dlp não instalado"}
+            print("\n📥 Baixando vídeo e analisando em paralelo...")
+            download = DownloadProgressivo(url, self.pasta_downloads, f"video_{job.id_job}").iniciar()
+            try:
+                resumo = self.gerar_resumo_progressivo(download, info_video, num_frames, job=job)
+                caminho_video = download.aguardar()
+            finally:
+                # Ctrl-C ou erro na análise: o download não pode seguir sozinho em segundo
+                # plano (a próxima execução apagaria o parcial que ele ainda está escrevendo)
+                download.cancelar()
+            if not caminho_video:
+                return {"erro": f"Falha ao baixar vídeo: {download.erro}"}
+            job.concluir('download', caminho_video=caminho_video)
+        else:
+            print("\n📥 Baixando vídeo...")
+            caminho_video = self.baixar_video(url, nome_base=f"video_{job.id_job}")
+            if not caminho_video:
+                return {"erro": "Falha ao baixar vídeo"}
+            job.concluir('download', caminho_video=caminho_video)
         
         # 3. Analisar com IA
-        print("\n🤖 Iniciando análise visual com IA...")
-        resumo = self.gerar_resumo_video(caminho_video, info_video, num_frames)
+        if resumo is None:
+            print("\n🤖 Iniciando análise visual com IA...")
+            resumo = self.gerar_resumo_video(caminho_video, info_video, num_frames, job=job)
+        if 'erro' in resumo:
+            return resumo
         
         # 4. Salvar resumo
         print("\n💾 Salvando resumo...")
         nome_arquivo = re.sub(r'[<>:"/\\|?*]', '_', info_video['titulo'])[:50]
         self.salvar_resumo(resumo, nome_arquivo)
         
+        # Só um resumo com todas as legendas fica em cache; senão a próxima execução tenta de novo
+        falhas = resumo['analise']['frames_com_erro']
+        if self.ia_disponivel and falhas == 0:
+            job.concluir('resumo', resumo=resumo)
+        elif falhas:
+            print(f"⚠️ {falhas} frame(s) sem legenda: rode de novo com a mesma URL para tentar novamente")
+        
         # 5. Limpeza opcional (remover vídeo baixado)
         print(f"\n🗑️ Arquivo de vídeo mantido em: {caminho_video}")
         print("   (você pode deletar manualmente se quiser economizar espaço)")
@@ -365,6 +500,7 @@ def main():
         
         if escolha == "3":
             print("👋 Até logo!")
+            analyzer.fechar()
             break
         
         if escolha not in ["1", "2"]:
@@ -381,8 +517,10 @@ def main():
                 print("\n🎯 Iniciando análise completa...")
                 num_frames = input("📊 Quantos frames analisar? (padrão: 8): ").strip()
                 num_frames = int(num_frames) if num_frames.isdigit() else 8
+                progressivo = input("⚡ Analisar enquanto baixa? (s/N): ").strip().lower() == "s"
                 
-                resumo = analyzer.analisar_url_youtube(url, baixar_video=True, num_frames=num_frames)
+                resumo = analyzer.analisar_url_youtube(url, baixar_video=True, num_frames=num_frames,
+                                                       progressivo=progressivo)
             else:
                 print("\n📋 Obtendo apenas informações básicas...")
                 resumo = analyzer.analisar_url_youtube(url, baixar_video=False)
@@ -398,5 +536,7 @@ def main():
         
         except KeyboardInterrupt:
             print("\n⏹️ Operação cancelada pelo usuário.")
+            print("♻️ O progresso foi salvo: repita a mesma URL para continuar de onde parou.")
+            print("   (no modo 'analisar enquanto baixa' o download recomeça do zero; as legendas prontas são reaproveitadas)")
         except Exception as e:
             print(f"❌ Erro inesperado: {str(e)}")
\ No newline at end of file
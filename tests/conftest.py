@@ -0,0 +1,23 @@
+import os
+import sys
+
+import pytest
+
+# The services are flat scripts imported by module name (see main.py)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "services"))
+
+
+@pytest.fixture
+def clip(tmp_path):
+    """Small generated video: every frame has a distinct brightness"""
+    cv2 = pytest.importorskip("cv2")
+    np = pytest.importorskip("numpy")
+
+    caminho = str(tmp_path / "clip.mp4")
+    writer = cv2.VideoWriter(caminho, cv2.VideoWriter_fourcc(*"mp4v"), 25, (160, 120))
+    for i in range(120):
+        frame = np.full((120, 160, 3), (i * 2) % 256, dtype=np.uint8)
+        cv2.putText(frame, str(i), (10, 80), cv2.FONT_HERSHEY_SIMPLEX, 2, (255, 0, 0), 3)
+        writer.write(frame)
+    writer.release()
+    return caminho
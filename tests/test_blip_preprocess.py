@@ -0,0 +1,93 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+np = pytest.importorskip("numpy")
+Image = pytest.importorskip("PIL.Image")
+transformers = pytest.importorskip("transformers")
+
+from blip_preprocess import PreprocessadorBLIP, dividir_em_lotes
+
+# Tolerância: o resize do PIL é reproduzido em float32, então no máximo um
+# passo de uint8 (1/255/desvio ~= 0.015) de diferença, e só em uma fração
+# ínfima dos valores; todo o resto bate até o arredondamento de float32
+UM_PASSO = 1 / 255 / 0.26130258 + 1e-4
+FRACAO_MAXIMA_DIFERENTE = 1e-4
+
+
+def _assert_paridade(obtido, esperado):
+    diferenca = np.abs(obtido - esperado)
+    assert diferenca.max() <= UM_PASSO
+    assert (diferenca > 1e-4).mean() <= FRACAO_MAXIMA_DIFERENTE
+
+
+@pytest.fixture(scope="module")
+def image_processor():
+    # Configuração padrão = a do "Salesforce/blip-image-captioning-base" (sem download)
+    return transformers.BlipImageProcessor()
+
+
+def _esperado(image_processor, frame):
+    imagem = Image.fromarray(np.ascontiguousarray(frame[:, :, ::-1]))
+    return image_processor(images=imagem, return_tensors="np")["pixel_values"][0]
+
+
+@pytest.mark.parametrize("altura,largura", [(480, 640), (720, 1280), (200, 300), (384, 384), (100, 1000)])
+def test_paridade_com_blip_processor(image_processor, altura, largura):
+    rng = np.random.default_rng(altura * largura)
+    # Ruído + bordas fortes: o pior caso para diferenças de interpolação
+    frame = rng.integers(0, 256, (altura, largura, 3), dtype=np.uint8)
+    frame[altura // 3:altura // 2, :, :] = 255
+    frame[:, largura // 4:largura // 3, 1] = 0
+
+    preprocessador = PreprocessadorBLIP(SimpleNamespace(image_processor=image_processor))
+    obtido = preprocessador.preparar_lote([frame])[0]
+
+    assert obtido.shape == (3, 384, 384)
+    _assert_paridade(obtido, _esperado(image_processor, frame))
+
+
+def test_lote_reaproveita_o_buffer(image_processor):
+    preprocessador = PreprocessadorBLIP(SimpleNamespace(image_processor=image_processor))
+    frames = [np.full((240, 320, 3), i * 40, dtype=np.uint8) for i in range(4)]
+
+    primeiro = preprocessador.preparar_lote(frames)
+    segundo = preprocessador.preparar_lote(frames[:2])
+    assert np.shares_memory(primeiro, segundo)
+    for frame, esperado in zip(frames[:2], segundo):
+        _assert_paridade(esperado, _esperado(image_processor, frame))
+
+
+def test_lote_com_tamanhos_diferentes(image_processor):
+    preprocessador = PreprocessadorBLIP(SimpleNamespace(image_processor=image_processor))
+    rng = np.random.default_rng(1)
+    frames = [rng.integers(0, 256, forma, dtype=np.uint8) for forma in [(240, 320, 3), (384, 500, 3), (240, 320, 3)]]
+
+    for frame, obtido in zip(frames, preprocessador.preparar_lote(frames)):
+        _assert_paridade(obtido, _esperado(image_processor, frame))
+
+
+def _melhor_tempo(funcao, repeticoes=7):
+    funcao()
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+
+def test_mais_rapido_que_o_blip_processor(image_processor):
+    preprocessador = PreprocessadorBLIP(SimpleNamespace(image_processor=image_processor))
+    frames = [np.random.default_rng(i).integers(0, 256, (720, 1280, 3), dtype=np.uint8) for i in range(4)]
+
+    numpy = _melhor_tempo(lambda: preprocessador.preparar_lote(frames))
+    processor = _melhor_tempo(lambda: [_esperado(image_processor, frame) for frame in frames])
+    # Medido: ~5-13 ms contra ~18-28 ms por frame 720p; sem margem extra, para
+    # não falhar numa máquina carregada (o melhor de várias rodadas já filtra ruído)
+    assert numpy < processor
+
+
+def test_dividir_em_lotes():
+    assert [len(l) for l in dividir_em_lotes(list(range(10)), 4)] == [4, 4, 2]
@@ -0,0 +1,104 @@
+import multiprocessing
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import caption_pool
+
+
+def test_throughput_divide_os_nucleos():
+    assert caption_pool.planejar_workers(None, "throughput", list(range(32))) == \
+        [list(range(i, i + 4)) for i in range(0, 32, 4)]
+    assert caption_pool.planejar_workers(2, "throughput", [0, 1, 2]) == [[0, 1], [2]]
+
+
+def test_latency_usa_um_worker_com_todos_os_nucleos():
+    assert caption_pool.planejar_workers(None, "latency", list(range(8))) == [list(range(8))]
+    assert caption_pool.planejar_workers(1, "latency", list(range(8))) == [list(range(8))]
+    with pytest.raises(ValueError):
+        caption_pool.planejar_workers(4, "latency", list(range(8)))
+    with pytest.raises(ValueError):
+        caption_pool.planejar_workers(2, "rapido", list(range(8)))
+
+
+def test_worker_substituto_herda_a_fatia_do_que_morreu():
+    fatias = [[0, 1], [2, 3]]
+    donos = multiprocessing.Array('i', 2)
+
+    morto = multiprocessing.Process(target=os.getpid)
+    morto.start()
+    morto.join()
+    donos[0] = morto.pid
+    donos[1] = os.getppid()
+
+    assert caption_pool._reservar_fatia(fatias, donos) == [0, 1]
+    assert donos[0] == os.getpid()
+
+
+# --- Vazão com um modelo falso (só CPU, sem baixar o BLIP) ---
+
+class _ProcessorFalso:
+    def batch_decode(self, output, skip_special_tokens=True):
+        return [f"legenda {float(v):.3f}" for v in output]
+
+
+try:
+    import torch
+except ImportError:
+    torch = None
+
+if torch is not None:
+    # No nível do módulo: os workers "spawn" precisam conseguir importar a classe
+    class _ModeloFalso(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.peso = torch.nn.Parameter(torch.randn(512, 512))
+
+        def generate(self, pixel_values, **kwargs):
+            saidas = []
+            for imagem in pixel_values:
+                x = imagem.reshape(3, -1)[:, :512].repeat(171, 1)[:512]
+                for _ in range(40):
+                    x = torch.tanh(x @ self.peso)
+                saidas.append(x.mean())
+            return torch.stack(saidas)
+
+
+@pytest.fixture
+def modelo():
+    if not caption_pool.TORCH_DISPONIVEL:
+        pytest.skip("precisa de torch")
+    return _ModeloFalso()
+
+
+def test_pool_legenda_igual_ao_modo_sem_pool(modelo):
+    frames = [np.full((120, 160, 3), i * 10, dtype=np.uint8) for i in range(6)]
+    preprocessador = caption_pool.PreprocessadorBLIP()
+    esperadas = [legenda for lote in caption_pool.dividir_em_lotes(frames)
+                 for legenda in caption_pool.legendar_lote(_ProcessorFalso(), modelo, preprocessador, lote)]
+
+    with caption_pool.PoolLegendas(_ProcessorFalso(), modelo, num_workers=1) as pool:
+        assert pool.legendar(frames) == esperadas
+
+
+def test_vazao_escala_com_os_workers(modelo, monkeypatch):
+    nucleos = caption_pool.nucleos_disponiveis()
+    if len(nucleos) < 2:
+        pytest.skip("precisa de pelo menos 2 núcleos")
+
+    frames = [np.full((120, 160, 3), i, dtype=np.uint8) for i in range(16)]
+
+    monkeypatch.setattr(caption_pool, "nucleos_disponiveis", lambda: nucleos[:1])
+    with caption_pool.PoolLegendas(_ProcessorFalso(), modelo, num_workers=1) as pool:
+        legendas = pool.legendar(frames)
+        vazao_1 = pool.medir_vazao(frames)
+
+    monkeypatch.setattr(caption_pool, "nucleos_disponiveis", lambda: nucleos[:2])
+    with caption_pool.PoolLegendas(_ProcessorFalso(), modelo, num_workers=2) as pool:
+        assert pool.legendar(frames) == legendas
+        vazao_2 = pool.medir_vazao(frames)
+
+    # Dois workers em núcleos separados: perto do dobro
+    assert vazao_2 > 1.6 * vazao_1
@@ -0,0 +1,128 @@
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+np = pytest.importorskip("numpy")
+
+import frame_extractor
+import frame_sampler
+
+_VideoCapture = cv2.VideoCapture
+
+
+def _read_with_seek(caminho, indices):
+    """Reference: the old set() + read() per sample"""
+    video = cv2.VideoCapture(caminho)
+    frames = []
+    for idx in indices:
+        video.set(cv2.CAP_PROP_POS_FRAMES, idx)
+        ret, frame = video.read()
+        if ret:
+            frames.append(frame)
+    video.release()
+    return frames
+
+
+def _read_sequential(caminho, indices):
+    """Reference: decode everything and keep the wanted frames"""
+    video = cv2.VideoCapture(caminho)
+    wanted, frames, index = set(indices), {}, 0
+    while True:
+        ret, frame = video.read()
+        if not ret:
+            break
+        if index in wanted:
+            frames[index] = frame
+        index += 1
+    video.release()
+    return [frames[i] for i in indices if i in frames]
+
+
+def _same(a, b):
+    return len(a) == len(b) and all(np.array_equal(x, y) for x, y in zip(a, b))
+
+
+@pytest.mark.parametrize("num_frames", [1, 6, 8, 200])
+def test_sample_uniform_matches_seek_and_read(clip, num_frames):
+    indices = np.linspace(0, 119, num_frames, dtype=int)
+    frames = [frame for _, frame in frame_sampler.sample_uniform(clip, num_frames)]
+    assert _same(frames, _read_with_seek(clip, indices))
+
+
+@pytest.mark.parametrize("seek_gap", [0, 10, float("inf")])
+def test_grab_and_seek_give_the_same_frames(clip, seek_gap):
+    indices = [0, 3, 4, 50, 51, 110, 119]
+    frames = [frame for _, frame in frame_sampler.sample_indices(clip, indices, seek_gap=seek_gap)]
+    assert _same(frames, _read_sequential(clip, indices))
+
+
+def test_sample_uniform_numbered_keeps_plan_positions(clip):
+    amostras = list(frame_sampler.sample_uniform_numbered(clip, 5))
+    assert [sample for sample, _, _ in amostras] == [0, 1, 2, 3, 4]
+    assert [index for _, index, _ in amostras] == [0, 29, 59, 89, 119]
+
+
+def test_timestamps_and_time_range(clip):
+    assert [i for i, _ in frame_sampler.sample_timestamps(clip, [2.0, 0.4, 99])] == [10, 50]
+    assert [i for i, _ in frame_sampler.sample_time_range(clip, 1, 3, 1)] == [25, 50]
+
+
+class _UnknownLengthCapture:
+    """Wraps a capture but reports an unknown frame count, like some streams"""
+
+    def __init__(self, caminho):
+        self.video = cv2.VideoCapture(caminho)
+        self.seeks = 0
+
+    def get(self, prop):
+        return 0 if prop == cv2.CAP_PROP_FRAME_COUNT else self.video.get(prop)
+
+    def set(self, prop, value):
+        self.seeks += 1
+        return self.video.set(prop, value)
+
+    def __getattr__(self, name):
+        return getattr(self.video, name)
+
+
+def test_every_n_reads_until_eof_when_length_unknown(clip):
+    video = _UnknownLengthCapture(clip)
+    indices = frame_sampler.every_n_indices(0, 40)
+    assert [i for i, _ in frame_sampler.sample_capture(video, indices)] == [0, 40, 80]
+    assert video.seeks == 0
+
+
+class _FlakyCapture:
+    """Wraps a capture whose read() fails once when it reaches frame `bad`"""
+
+    def __init__(self, caminho, bad):
+        self.video = _VideoCapture(caminho)
+        self.bad = bad
+        self.failed = False
+
+    def read(self):
+        if not self.failed and int(self.video.get(cv2.CAP_PROP_POS_FRAMES)) == self.bad:
+            self.failed = True
+            self.video.grab()
+            return False, None
+        return self.video.read()
+
+    def __getattr__(self, name):
+        return getattr(self.video, name)
+
+
+def test_failed_read_mid_video_only_skips_that_frame(clip, monkeypatch):
+    monkeypatch.setattr(frame_sampler.cv2, "VideoCapture", lambda caminho: _FlakyCapture(caminho, bad=59))
+    amostras = list(frame_sampler.sample_uniform_numbered(clip, 5))
+
+    # Sample 2 (frame 59) is lost; the ones after it are still read
+    assert [(sample, index) for sample, index, _ in amostras] == [(0, 0), (1, 29), (3, 89), (4, 119)]
+    assert _same([frame for _, _, frame in amostras], _read_with_seek(clip, [0, 29, 89, 119]))
+
+
+def test_extract_key_frames_matches_old_output(clip, tmp_path):
+    pasta = tmp_path / "frames"
+    frame_extractor.extract_key_frames(clip, 5, output_folder=str(pasta))
+    salvos = [cv2.imread(str(pasta / f"summary_frame_{i}.jpg")) for i in range(5)]
+    esperados = [cv2.imdecode(cv2.imencode(".jpg", f)[1], cv2.IMREAD_COLOR)
+                 for f in _read_sequential(clip, [0, 24, 48, 72, 96])]
+    assert _same(salvos, esperados)
@@ -0,0 +1,70 @@
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+np = pytest.importorskip("numpy")
+
+import frame_sampler
+import multi_analyzer
+
+_VideoCapture = cv2.VideoCapture
+
+
+class _CountingCapture:
+    """cv2.VideoCapture that counts full decodes (read) and skips (grab)"""
+
+    instances = []
+
+    def __init__(self, caminho):
+        self.video = _VideoCapture(caminho)
+        self.reads = 0
+        self.grabs = 0
+        _CountingCapture.instances.append(self)
+
+    def read(self):
+        self.reads += 1
+        return self.video.read()
+
+    def grab(self):
+        self.grabs += 1
+        return self.video.grab()
+
+    def __getattr__(self, name):
+        return getattr(self.video, name)
+
+
+@pytest.fixture
+def counting(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    _CountingCapture.instances = []
+    monkeypatch.setattr(multi_analyzer.cv2, "VideoCapture", _CountingCapture)
+    return _CountingCapture.instances
+
+
+def test_combined_analysis_decodes_once_and_stops_early(clip, counting):
+    analyzer = multi_analyzer.MultiAnalyzer()
+    analyzer.register("frames", multi_analyzer.IntervalSampler(5))
+    analyzer.register("scenes", multi_analyzer.SceneScorer(5, threshold=1))
+    analyzer.register("captions", multi_analyzer.CaptionSampler(6))
+    analyzer.register("stats", multi_analyzer.VideoStatistics())
+    results = analyzer.run(clip)
+
+    assert len(counting) == 1
+    assert len(results["frames"]) == 5
+    assert len(results["scenes"]) == 5
+    assert results["stats"]["total_frames"] == 120
+    # Only the distinct wanted indices are decoded: scenes 0-4, interval
+    # 24/48/72/96, captions 23/47/71/95/119, stats 17/34/51/68/85/102
+    assert counting[0].reads == 20
+
+    esperados = [frame for _, frame in frame_sampler.sample_uniform(clip, 6)]
+    assert len(results["captions"]) == 6
+    assert all(np.array_equal(a, b) for a, b in zip(results["captions"], esperados))
+
+
+def test_statistics_alone_only_reads_its_samples(clip, counting):
+    analyzer = multi_analyzer.MultiAnalyzer()
+    analyzer.register("stats", multi_analyzer.VideoStatistics(num_samples=4))
+    stats = analyzer.run(clip)["stats"]
+
+    assert counting[0].reads == 4
+    assert stats["duration_s"] == pytest.approx(120 / 25)
@@ -0,0 +1,127 @@
+import os
+import struct
+import time
+
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+np = pytest.importorskip("numpy")
+pytest.importorskip("yt_dlp")
+
+import frame_sampler
+import progressive
+
+NUM_FRAMES = 8
+
+
+def _atoms(dados, inicio=0, fim=None):
+    """(tipo, início, tamanho) dos boxes MP4 em dados[inicio:fim]"""
+    fim = len(dados) if fim is None else fim
+    while inicio < fim:
+        tamanho, tipo = struct.unpack(">I4s", dados[inicio:inicio + 8])
+        yield tipo, inicio, tamanho
+        inicio += tamanho
+
+
+def _faststart(dados: bytes) -> bytes:
+    """Move o moov para antes do mdat (como qt-faststart), corrigindo os offsets"""
+    topo = list(_atoms(dados))
+    moov = next(a for a in topo if a[0] == b"moov")
+    moov_bytes = bytearray(dados[moov[1]:moov[1] + moov[2]])
+
+    def corrigir(inicio, fim):
+        for tipo, pos, tamanho in _atoms(moov_bytes, inicio, fim):
+            if tipo in (b"trak", b"mdia", b"minf", b"stbl"):
+                corrigir(pos + 8, pos + tamanho)
+            elif tipo in (b"stco", b"co64"):
+                formato, largura = (">I", 4) if tipo == b"stco" else (">Q", 8)
+                quantidade = struct.unpack(">I", moov_bytes[pos + 12:pos + 16])[0]
+                for i in range(quantidade):
+                    p = pos + 16 + i * largura
+                    valor = struct.unpack(formato, moov_bytes[p:p + largura])[0]
+                    moov_bytes[p:p + largura] = struct.pack(formato, valor + len(moov_bytes))
+
+    corrigir(8, len(moov_bytes))
+    ftyp = next(a for a in topo if a[0] == b"ftyp")
+    resto = [dados[p:p + t] for tipo, p, t in topo if tipo not in (b"ftyp", b"moov")]
+    return dados[ftyp[1]:ftyp[1] + ftyp[2]] + bytes(moov_bytes) + b"".join(resto)
+
+
+@pytest.fixture
+def servidor(tmp_path):
+    """Serve um clipe MP4 "faststart" de ~1 MB a ~400 KB/s"""
+    pasta = tmp_path / "servidor"
+    pasta.mkdir()
+    caminho = str(pasta / "clip_original.mp4")
+
+    rng = np.random.default_rng(0)
+    writer = cv2.VideoWriter(caminho, cv2.VideoWriter_fourcc(*"mp4v"), 25, (160, 120))
+    for i in range(100):
+        frame = rng.integers(0, 256, (120, 160, 3), dtype=np.uint8)
+        cv2.putText(frame, str(i), (10, 80), cv2.FONT_HERSHEY_SIMPLEX, 2, (255, 255, 255), 3)
+        writer.write(frame)
+    writer.release()
+
+    with open(caminho, "rb") as f:
+        dados = _faststart(f.read())
+    with open(pasta / "clip.mp4", "wb") as f:
+        f.write(dados)
+
+    s = progressive.servir_arquivo_lento(str(pasta), bytes_por_segundo=400 * 1024)
+    yield f"http://127.0.0.1:{s.server_address[1]}/clip.mp4", str(pasta / "clip.mp4"), len(dados)
+    s.shutdown()
+
+
+def _rodar(url, pasta):
+    download = progressive.DownloadProgressivo(url, str(pasta), "video_job", qualidade="best").iniciar()
+    recebidos = [(amostra, frame, download.terminado)
+                 for amostra, frame in progressive.frames_progressivos(download, NUM_FRAMES, intervalo=0.05)]
+    return download, recebidos
+
+
+def test_frames_chegam_antes_do_fim_do_download(servidor, tmp_path):
+    url, original, _ = servidor
+    download, recebidos = _rodar(url, tmp_path)
+
+    assert download.aguardar() is not None
+    assert [amostra for amostra, _, _ in recebidos] == list(range(NUM_FRAMES))
+    # O primeiro frame saiu enquanto o arquivo ainda estava sendo baixado
+    assert recebidos[0][2] is False
+
+    esperados = [frame for _, _, frame in frame_sampler.sample_uniform_numbered(original, NUM_FRAMES)]
+    assert all(np.array_equal(frame, esperado) for (_, frame, _), esperado in zip(recebidos, esperados))
+
+
+def test_parcial_antigo_nao_conta_como_download_completo(servidor, tmp_path):
+    url, _, tamanho = servidor
+    # Sobra de uma execução interrompida
+    with open(tmp_path / f"video_job{progressive.SUFIXO_PARCIAL}.mp4", "wb") as f:
+        f.write(b"\0" * 1000)
+
+    download, recebidos = _rodar(url, tmp_path)
+    caminho = download.aguardar()
+
+    assert caminho == str(tmp_path / "video_job.mp4")
+    assert os.path.getsize(caminho) == tamanho
+    assert len(recebidos) == NUM_FRAMES
+    assert not [a for a in os.listdir(tmp_path) if progressive.SUFIXO_PARCIAL in a]
+
+
+def test_cancelar_interrompe_o_download(servidor, tmp_path):
+    url, _, tamanho = servidor
+    download = progressive.DownloadProgressivo(url, str(tmp_path), "video_job", qualidade="best").iniciar()
+    while download.bytes_baixados == 0 and not download.terminado:
+        time.sleep(0.05)
+
+    download.cancelar()
+
+    assert download.terminado
+    assert not download._thread.is_alive()
+    assert download.aguardar() is None
+    # Nada recebeu o nome final, e o parcial parou de crescer
+    assert not os.path.exists(tmp_path / "video_job.mp4")
+    parciais = [tmp_path / a for a in os.listdir(tmp_path) if progressive.SUFIXO_PARCIAL in a]
+    tamanhos = [os.path.getsize(p) for p in parciais]
+    time.sleep(0.3)
+    assert [os.path.getsize(p) for p in parciais] == tamanhos
+    assert all(t < tamanho for t in tamanhos)
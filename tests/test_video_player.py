@@ -0,0 +1,48 @@
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+np = pytest.importorskip("numpy")
+
+import frame_sampler
+import video_player
+from multi_analyzer import CaptionSampler
+
+
+def test_tecla_i_e_reproducao_ate_o_fim_nao_duplicam_frames(clip):
+    video = cv2.VideoCapture(clip)
+    amostrador = CaptionSampler(num_frames=6)
+    amostrador.start(frame_sampler.capture_info(video))
+
+    # Reproduz um pedaço, aperta 'i' e continua até o fim (como player_com_ia)
+    contador_frame = 0
+    while True:
+        if contador_frame == 30:
+            video_player.completar_amostrador(video, amostrador, contador_frame)
+            assert amostrador.done
+        ret, frame = video.read()
+        if not ret:
+            break
+        # A reprodução continua exatamente de onde estava
+        assert int(video.get(cv2.CAP_PROP_POS_FRAMES)) == contador_frame + 1
+        video_player.guardar_frame_ia(amostrador, contador_frame, frame)
+        contador_frame += 1
+    video.release()
+
+    assert contador_frame == 120
+    assert amostrador.remaining == 0
+    esperados = [frame for _, frame in frame_sampler.sample_uniform(clip, 6)]
+    assert len(amostrador.frames) == 6
+    assert all(np.array_equal(a, b) for a, b in zip(amostrador.frames, esperados))
+
+
+def test_caption_sampler_ignora_indice_repetido():
+    amostrador = CaptionSampler(num_frames=3)
+    amostrador.start({"total_frames": 10})
+    frame = np.zeros((2, 2, 3), dtype=np.uint8)
+
+    amostrador.process(0, frame)
+    amostrador.process(0, frame + 1)
+
+    assert len(amostrador.frames) == 1
+    assert amostrador.frames[0].max() == 0
+    assert amostrador.remaining == 2
@@ -0,0 +1,89 @@
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+np = pytest.importorskip("numpy")
+
+import frame_sampler
+import youtube_IA
+
+
+def _legenda(frame):
+    return f"frame {int(frame[::4, ::4].mean())}"
+
+
+class _AnalisadorFalso(youtube_IA.YouTubeVideoAnalyzer):
+    """Sem BLIP nem YouTube: legenda pelo brilho e falha no lote escolhido"""
+
+    def __init__(self, pasta, clip, falhar_lotes=()):
+        super().__init__(pasta_downloads=str(pasta))
+        self.clip = clip
+        self.ia_disponivel = True
+        self.falhar_lotes = set(falhar_lotes)
+        self.lotes = 0
+        self.legendados = 0
+
+    def obter_info_video(self, url):
+        return {'titulo': 'clipe', 'canal': 'teste', 'duracao': 5, 'visualizacoes': 0}
+
+    def baixar_video(self, url, qualidade="worst", nome_base=None):
+        return self.clip
+
+    def analisar_frames_ia(self, frames):
+        self.lotes += 1
+        if self.lotes in self.falhar_lotes:
+            raise youtube_IA.ErroAnaliseIA("falha simulada")
+        self.legendados += len(frames)
+        return [_legenda(frame) for frame in frames]
+
+
+@pytest.fixture(autouse=True)
+def sem_blip(monkeypatch):
+    monkeypatch.setattr(youtube_IA, "BLIP_DISPONIVEL", False)
+
+
+def test_resumo_com_falha_nao_fica_em_cache_e_retoma(clip, tmp_path):
+    esperadas = {a: _legenda(f) for a, _, f in frame_sampler.sample_uniform_numbered(clip, 10)}
+
+    # 1ª execução: o segundo lote (amostras 4-7) falha
+    analisador = _AnalisadorFalso(tmp_path, clip, falhar_lotes={2})
+    resumo = analisador.analisar_url_youtube("url", num_frames=10)
+    assert resumo['analise']['frames_com_erro'] == 4
+    assert [d['descricao'] for d in resumo['descricoes_frames']][4:8] == [youtube_IA.LEGENDA_FALHOU] * 4
+
+    # 2ª execução: só as amostras que faltavam são legendadas, nas posições certas
+    analisador = _AnalisadorFalso(tmp_path, clip)
+    resumo = analisador.analisar_url_youtube("url", num_frames=10)
+    assert analisador.legendados == 4
+    assert resumo['analise']['frames_com_erro'] == 0
+    assert {d['frame'] - 1: d['descricao'] for d in resumo['descricoes_frames']} == esperadas
+
+    # 3ª execução: resumo completo vem do checkpoint
+    analisador = _AnalisadorFalso(tmp_path, clip)
+    assert analisador.analisar_url_youtube("url", num_frames=10) == resumo
+    assert analisador.lotes == 0
+
+
+def test_interromper_analise_progressiva_cancela_o_download(clip, tmp_path, monkeypatch):
+    downloads = []
+
+    class _DownloadFalso:
+        def __init__(self, *args, **kwargs):
+            self.cancelado = False
+            downloads.append(self)
+
+        def iniciar(self):
+            return self
+
+        def cancelar(self):
+            self.cancelado = True
+
+    def _interromper(*args, **kwargs):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(youtube_IA, "DownloadProgressivo", _DownloadFalso)
+    analisador = _AnalisadorFalso(tmp_path, clip)
+    monkeypatch.setattr(analisador, "gerar_resumo_progressivo", _interromper)
+
+    with pytest.raises(KeyboardInterrupt):
+        analisador.analisar_url_youtube("url", num_frames=4, progressivo=True)
+    assert len(downloads) == 1 and downloads[0].cancelado